@@ -3,25 +3,180 @@ Audio Processing Module for BBC News Bulletin Scraper
 Handles audio trimming, format conversion, and normalisation.
 """
 
+import asyncio
+import copy
+import hashlib
 import logging
+import logging.handlers
+import multiprocessing
 import os
 import subprocess
-import time
+import sys
+import tempfile
 import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache, partial
 from pathlib import Path
-from typing import Optional
+from typing import BinaryIO, Optional, Tuple, Union
+
+if sys.platform == "win32":
+    import msvcrt
+else:
+    import fcntl
+
+try:
+    import orjson as _json
+except ImportError:
+    import json as _json  # type: ignore[no-redef]
+
+try:
+    from mutagen import File as MutagenFile
+except ImportError:
+    MutagenFile = None
+
+# Containers whose headers mutagen reads reliably, other files go to ffprobe
+_MUTAGEN_SUFFIXES = frozenset({".mp3", ".m4a", ".mp4", ".wav"})
+
+# ffprobe arguments for the full format and stream information as JSON
+_FFPROBE_ARGS = (
+    "-hide_banner",
+    "-v",
+    "quiet",
+    "-print_format",
+    "json",
+    "-show_format",
+    "-show_streams",
+)
+
+# Maximum number of jobs process_many combines into a single ffmpeg run
+_COMBINED_MAX_JOBS = 16
+
+# Combined input duration (seconds) above which process_many processes jobs one by
+# one, as a multi-output ffmpeg run buffers audio for every output at once
+_COMBINED_MAX_DURATION = 1800
+
+# Lock files guarding outputs being processed, kept out of the output directory
+_LOCK_DIR = Path(tempfile.gettempdir()) / "bbc-scraper-locks"
+
+# Audio input accepted by process_audio: a file on disk, or data already in memory
+AudioInput = Union[Path, bytes, BinaryIO]
+
+
+def _progress_duration(progress: bytes) -> Optional[float]:
+    """Get the final output time (seconds) from ffmpeg -progress output."""
+    for line in reversed(progress.splitlines()):
+        if line.startswith(b"out_time_us="):
+            try:
+                return int(line[len(b"out_time_us=") :]) / 1_000_000
+            except ValueError:
+                return None  # N/A when nothing was written
+    return None
+
+
+@lru_cache(maxsize=1024)
+def _probe(path_str: str, mtime_ns: int, size: int) -> dict:
+    """
+    Run ffprobe on a file, caching the result per (path, mtime, size).
+
+    Raises on failure so that errors are not cached. The result is shared
+    between calls, so callers outside this module get a copy.
+    """
+    # JSON is parsed straight from the raw stdout bytes, no text decoding needed
+    result = subprocess.run(
+        ["ffprobe", *_FFPROBE_ARGS, path_str],
+        stdin=subprocess.DEVNULL,
+        capture_output=True,
+        timeout=30,
+    )
+
+    if result.returncode != 0:
+        raise RuntimeError(f"ffprobe failed: {result.stderr.decode(errors='replace')}")
+
+    return _json.loads(result.stdout)
+
+
+class _ForwardHandler(logging.Handler):
+    """Pass records from worker processes on to this process's loggers."""
+
+    def emit(self, record: logging.LogRecord) -> None:
+        logging.getLogger(record.name).handle(record)
+
+
+def _init_worker_logging(log_queue: multiprocessing.Queue, level: int) -> None:
+    """Send a worker process's log records to the batch's log queue."""
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.handlers[:] = [logging.handlers.QueueHandler(log_queue)]
+
+
+def _process_job(config: dict, threads_per_job: int, job: tuple) -> bool:
+    """Process a single (input, output, programme_config) job in a worker process."""
+    input_file, output_file, programme_config = job
+    try:
+        return AudioProcessor(config, threads_per_job).process_audio(
+            input_file, output_file, programme_config
+        )
+    except Exception as e:
+        logging.error("Batch audio processing error for %s: %s", input_file, e)
+        return False
 
 
 class AudioProcessor:
     """Handles audio processing using ffmpeg."""
 
-    def __init__(self, config: dict):
+    # Bitrate for each quality setting, and the fallback for unknown settings
+    _QUALITY_TABLE = {
+        "mp3": {"high": "320k", "std": "192k", "med": "128k", "low": "96k"},
+        "m4a": {"high": "256k", "std": "128k", "med": "96k", "low": "64k"},
+    }
+    _DEFAULT_BITRATE = {"mp3": "192k", "m4a": "128k"}
+
+    # Encoder for each output format
+    _CODEC_ARGS = {
+        "mp3": ["-codec:a", "libmp3lame"],
+        "m4a": ["-codec:a", "aac"],
+        "wav": ["-codec:a", "pcm_s16le"],
+    }
+
+    # ffmpeg muxer for output formats whose muxer has a different name
+    _MUXERS = {"m4a": "ipod"}
+
+    # Muxer options for each output format
+    _MUXER_ARGS = {
+        # Index at the start of the file, so players can stream it straight away
+        "m4a": ["-movflags", "+faststart"],
+        # Switch to RF64 rather than failing past the 4GB WAV size limit
+        "wav": ["-rf64", "auto"],
+        # ID3v2.3 tags are the most widely supported, Xing header for seeking
+        "mp3": ["-id3v2_version", "3", "-write_xing", "1"],
+    }
+
+    def __init__(self, config: dict, threads_per_job: Optional[int] = None):
+        """
+        Args:
+            config: Application configuration
+            threads_per_job: ffmpeg threads per job (None lets ffmpeg decide)
+        """
         self.config = config
         self.audio_config = config.get("audio", {})
+        self.threads_per_job = threads_per_job
+
+        # Command parts that only depend on the config are built once
+        # Global options: never read commands from stdin (piped audio input is
+        # unaffected), only report errors without banner or per-frame progress to
+        # keep stderr small, and -y to overwrite output files
+        self._ffmpeg_base = ["ffmpeg", "-nostdin", "-hide_banner", "-nostats"]
+        self._ffmpeg_base.extend(["-loglevel", "error", "-y"])
+        self._ffmpeg_base.extend(self._ffmpeg_thread_args())
+        # Codec, bitrate and format options for each known output format
+        self._codec_tails = {
+            output_format: self._build_codec_tail(output_format)
+            for output_format in self._CODEC_ARGS
+        }
 
     def process_audio(
         self,
-        input_file: Path,
+        input_file: AudioInput,
         output_file: Path,
         programme_config: Optional[dict] = None,
     ) -> bool:
@@ -29,57 +184,57 @@ class AudioProcessor:
         Process audio file with trimming and format conversion.
 
         Args:
-            input_file: Path to input audio file
+            input_file: Path to input audio file, or the audio as bytes or a
+                binary stream, which is piped to ffmpeg without a temporary file
+                (piped MP4/M4A input needs its index at the start, as with faststart)
             output_file: Path to output audio file
             programme_config: Programme-specific config (optional, overrides global settings)
 
         Returns:
             bool: True if processing successful, False otherwise
         """
-        # Create lock file to prevent concurrent processing of same output
-        lock_file = output_file.with_suffix(".lock")
+        return self._process_audio(input_file, output_file, programme_config)[0]
+
+    def process_audio_with_duration(
+        self,
+        input_file: AudioInput,
+        output_file: Path,
+        programme_config: Optional[dict] = None,
+    ) -> Tuple[bool, Optional[float]]:
+        """
+        Process audio file as process_audio does, also reporting its duration.
+
+        The duration is read from ffmpeg's progress output, so the result
+        doesn't need probing afterwards.
+
+        Returns:
+            tuple: (success, output duration in seconds), where the duration is
+                None if this call didn't produce the output itself
+        """
+        return self._process_audio(
+            input_file, output_file, programme_config, report_duration=True
+        )
+
+    def _process_audio(
+        self,
+        input_file: AudioInput,
+        output_file: Path,
+        programme_config: Optional[dict] = None,
+        report_duration: bool = False,
+    ) -> Tuple[bool, Optional[float]]:
+        """Process audio file, optionally reading the output duration from ffmpeg."""
+        # Lock file to prevent concurrent processing of same output
+        lock_file = self._lock_file_for(output_file)
 
         # Check if output file already exists and is recent
         if output_file.exists():
-            logging.info(f"Output file already exists: {output_file}")
-            return True
+            logging.info("Output file already exists: %s", output_file)
+            return True, None
 
-        # Try to acquire lock with stale lock detection
-        try:
-            lock_fd = os.open(str(lock_file), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
-        except FileExistsError:
-            # Check if the lock file is stale (older than 10 minutes)
-            if lock_file.exists():
-                lock_age = time.time() - lock_file.stat().st_mtime
-                if lock_age > 600:  # 10 minutes
-                    logging.warning(
-                        f"Removing stale lock file (age: {lock_age:.1f}s): {lock_file}"
-                    )
-                    try:
-                        lock_file.unlink()
-                        # Try to acquire lock again after removing stale lock
-                        lock_fd = os.open(
-                            str(lock_file), os.O_CREAT | os.O_EXCL | os.O_WRONLY
-                        )
-                    except (FileExistsError, OSError) as e:
-                        logging.warning(
-                            f"Could not remove stale lock or re-acquire: {e}"
-                        )
-                        return True
-                else:
-                    logging.info(
-                        f"Another process is processing {output_file} (lock age: {lock_age:.1f}s), skipping"
-                    )
-                    return True  # Consider this success since another process is handling it
-            else:
-                # Race condition: lock file disappeared between check and open
-                try:
-                    lock_fd = os.open(
-                        str(lock_file), os.O_CREAT | os.O_EXCL | os.O_WRONLY
-                    )
-                except FileExistsError:
-                    logging.info(f"Lock file reappeared for {output_file}, skipping")
-                    return True
+        lock_fd = self._acquire_lock(lock_file, output_file)
+        if lock_fd is None:
+            # Consider this success since another process is handling it
+            return True, None
 
         try:
             # Create temporary file in same directory as output to ensure atomic move works
@@ -90,198 +245,766 @@ class AudioProcessor:
             # Double-check output file doesn't exist after acquiring lock
             if output_file.exists():
                 logging.info(
-                    f"Output file created while waiting for lock: {output_file}"
+                    "Output file created while waiting for lock: %s", output_file
                 )
-                return True
-            # Get processing parameters - programme config overrides global config
-            trim_start_seconds = (programme_config or {}).get(
-                "trim_start_seconds", self.audio_config.get("trim_start_seconds", 0)
-            )
-            trim_end_seconds = (programme_config or {}).get(
-                "trim_end_seconds", self.audio_config.get("trim_end_seconds", 0)
-            )
+                return True, None
 
-            normalise_lufs = self.audio_config.get("normalise_lufs")
-            # Support legacy normalize/normalise boolean setting
-            if normalise_lufs is None:
-                legacy_normalise = self.audio_config.get(
-                    "normalise", False
-                ) or self.audio_config.get("normalize", False)
-                normalise_lufs = -16 if legacy_normalise else None
-            output_format = self.audio_config.get("format", "mp3")
+            # In-memory input is fed to ffmpeg on stdin
+            input_path = input_file if isinstance(input_file, Path) else None
+            stdin_kwargs = self._stdin_for(input_file)
 
             # Build ffmpeg command - process to temporary file
             cmd = self._build_ffmpeg_command(
-                input_file,
+                input_path,
                 temp_file,  # Use temporary file as output
-                trim_start_seconds,
-                trim_end_seconds,
-                normalise_lufs,
-                output_format,
+                *self._get_processing_params(programme_config),
             )
+            if report_duration:
+                # Progress (including the output time) is written to stdout
+                cmd[1:1] = ["-progress", "pipe:1"]
 
-            logging.info(f"Processing audio: {input_file} -> {output_file}")
-            logging.debug(f"FFmpeg command: {' '.join(cmd)}")
+            logging.info(
+                "Processing audio: %s -> %s", input_path or "pipe", output_file
+            )
+            logging.debug("FFmpeg command: %s", " ".join(cmd))
 
             try:
-                # Execute ffmpeg
+                # Execute ffmpeg - only errors are logged, so stderr stays small
                 result = subprocess.run(
-                    cmd, capture_output=True, text=True, timeout=300  # 5 minute timeout
+                    cmd,
+                    **stdin_kwargs,
+                    stdout=subprocess.PIPE if report_duration else subprocess.DEVNULL,
+                    stderr=subprocess.PIPE,
+                    timeout=300,  # 5 minute timeout
                 )
-
-                if result.returncode == 0:
-                    # Atomically move temporary file to final destination
-                    # This prevents the race condition where a 0-byte file appears before processing completes
-                    temp_file.replace(output_file)
-                    logging.info(f"Audio processing completed: {output_file}")
-                    return True
-                else:
-                    logging.error(f"FFmpeg failed: {result.stderr}")
-                    # Clean up temporary file on failure
-                    if temp_file.exists():
-                        temp_file.unlink()
-                    return False
+                success = self._finalise_output(
+                    result.returncode,
+                    result.stderr.decode(errors="replace"),
+                    temp_file,
+                    output_file,
+                )
+                duration = (
+                    _progress_duration(result.stdout)
+                    if success and report_duration
+                    else None
+                )
+                return success, duration
 
             except subprocess.TimeoutExpired:
                 logging.error("Audio processing timed out")
                 # Clean up temporary file on timeout
-                if temp_file.exists():
-                    temp_file.unlink()
-                return False
+                self._remove_temp_file(temp_file)
+                return False, None
             except Exception as e:
-                logging.error(f"Audio processing error: {e}")
+                logging.error("Audio processing error: %s", e)
                 # Clean up temporary file on error
-                if temp_file.exists():
-                    temp_file.unlink()
-                return False
+                self._remove_temp_file(temp_file)
+                return False, None
 
         finally:
-            # Clean up lock file
+            self._release_lock(lock_fd, lock_file)
+
+    async def process_audio_async(
+        self,
+        input_file: Path,
+        output_file: Path,
+        programme_config: Optional[dict] = None,
+    ) -> bool:
+        """
+        Process audio file without blocking the event loop.
+
+        Behaves like process_audio, but awaits the ffmpeg subprocess so that many
+        bulletins can be processed concurrently with asyncio.gather.
+
+        Returns:
+            bool: True if processing successful, False otherwise
+        """
+        lock_file = self._lock_file_for(output_file)
+
+        if output_file.exists():
+            logging.info("Output file already exists: %s", output_file)
+            return True
+
+        lock_fd = self._acquire_lock(lock_file, output_file)
+        if lock_fd is None:
+            return True
+
+        try:
+            unique_id = uuid.uuid4().hex[:8]
+            temp_file = output_file.with_suffix(f".processing.{unique_id}")
+
+            if output_file.exists():
+                logging.info(
+                    "Output file created while waiting for lock: %s", output_file
+                )
+                return True
+
+            # Command building may probe the input duration, so keep it off the loop
+            cmd = await asyncio.to_thread(
+                self._build_ffmpeg_command,
+                input_file,
+                temp_file,
+                *self._get_processing_params(programme_config),
+            )
+
+            logging.info("Processing audio: %s -> %s", input_file, output_file)
+            logging.debug("FFmpeg command: %s", " ".join(cmd))
+
             try:
-                os.close(lock_fd)
-                if lock_file.exists():
-                    lock_file.unlink()
+                returncode, _stdout, stderr = await self._run_ffmpeg(cmd, timeout=300)
+                return self._finalise_output(
+                    returncode,
+                    stderr.decode(errors="replace"),
+                    temp_file,
+                    output_file,
+                )
+
+            except asyncio.TimeoutError:
+                logging.error("Audio processing timed out")
+                self._remove_temp_file(temp_file)
+                return False
             except Exception as e:
-                logging.warning(f"Failed to clean up lock file: {e}")
+                logging.error("Audio processing error: %s", e)
+                self._remove_temp_file(temp_file)
+                return False
+
+        finally:
+            self._release_lock(lock_fd, lock_file)
+
+    def _stdin_for(self, input_file: AudioInput) -> dict:
+        """Get the subprocess.run stdin arguments for an audio input."""
+        if isinstance(input_file, Path):
+            return {"stdin": subprocess.DEVNULL}
+        if isinstance(input_file, (bytes, bytearray, memoryview)):
+            return {"input": input_file}
+
+        # Streams backed by a real file descriptor are handed to ffmpeg directly
+        try:
+            input_file.fileno()
+            return {"stdin": input_file}
+        except (AttributeError, OSError, ValueError):
+            return {"input": input_file.read()}
+
+    async def _run_ffmpeg(
+        self, cmd: list, timeout: float
+    ) -> tuple[Optional[int], bytes, bytes]:
+        """Run an ffmpeg/ffprobe command asynchronously, killing it on timeout."""
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            raise
+
+        return proc.returncode, stdout, stderr
+
+    def _lock_file_for(self, output_file: Path) -> Path:
+        """Get the lock file path guarding an output file.
+
+        Named after the full output name, plus a digest of its absolute path so
+        outputs with the same name in different directories don't share a lock.
+        """
+        digest = hashlib.blake2b(
+            os.path.abspath(output_file).encode(), digest_size=4
+        ).hexdigest()
+        _LOCK_DIR.mkdir(exist_ok=True)
+        return _LOCK_DIR / f"{output_file.name}.{digest}.lock"
+
+    def _acquire_lock(self, lock_file: Path, output_file: Path) -> Optional[int]:
+        """
+        Acquire the processing lock for an output file.
+
+        The lock is held with flock (msvcrt on Windows) on a persistent lock file,
+        so the kernel releases it if the process dies and no stale lock cleanup is
+        needed.
+
+        Returns:
+            int: Lock file descriptor, or None if another process holds the lock
+        """
+        lock_fd = os.open(lock_file, os.O_CREAT | os.O_RDWR, 0o644)
+        try:
+            if sys.platform == "win32":
+                msvcrt.locking(lock_fd, msvcrt.LK_NBLCK, 1)
+            else:
+                fcntl.flock(lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except (BlockingIOError, PermissionError):
+            os.close(lock_fd)
+            logging.info("Another process is processing %s, skipping", output_file)
+            return None
+
+        return lock_fd
+
+    def _release_lock(self, lock_fd: int, lock_file: Path) -> None:
+        """Release the processing lock (the lock file itself is kept for reuse)."""
+        try:
+            if sys.platform == "win32":
+                msvcrt.locking(lock_fd, msvcrt.LK_UNLCK, 1)
+            os.close(lock_fd)
+        except Exception as e:
+            logging.warning("Failed to release lock file %s: %s", lock_file, e)
+
+    def _get_processing_params(
+        self, programme_config: Optional[dict]
+    ) -> tuple[float, float, float | None, str]:
+        """Resolve trim, normalisation and format settings for a programme."""
+        # Get processing parameters - programme config overrides global config
+        trim_start_seconds = (programme_config or {}).get(
+            "trim_start_seconds", self.audio_config.get("trim_start_seconds", 0)
+        )
+        trim_end_seconds = (programme_config or {}).get(
+            "trim_end_seconds", self.audio_config.get("trim_end_seconds", 0)
+        )
+
+        normalise_lufs = self.audio_config.get("normalise_lufs")
+        # Support legacy normalize/normalise boolean setting
+        if normalise_lufs is None:
+            legacy_normalise = self.audio_config.get(
+                "normalise", False
+            ) or self.audio_config.get("normalize", False)
+            normalise_lufs = -16 if legacy_normalise else None
+        output_format = self.audio_config.get("format", "mp3")
+
+        return trim_start_seconds, trim_end_seconds, normalise_lufs, output_format
+
+    def _finalise_output(
+        self, returncode: Optional[int], stderr: str, temp_file: Path, output_file: Path
+    ) -> bool:
+        """Move a successful ffmpeg result into place, or clean up after a failure."""
+        if returncode == 0:
+            # Atomically move temporary file to final destination
+            # This prevents the race condition where a 0-byte file appears before processing completes
+            temp_file.replace(output_file)
+            logging.info("Audio processing completed: %s", output_file)
+            return True
+
+        logging.error("FFmpeg failed: %s", stderr)
+        # Clean up temporary file on failure
+        self._remove_temp_file(temp_file)
+        return False
+
+    def _remove_temp_file(self, temp_file: Path) -> None:
+        """Remove a partially written temporary output file."""
+        if temp_file.exists():
+            temp_file.unlink()
+
+    def process_batch(
+        self,
+        jobs: list[tuple[Path, Path, Optional[dict]]],
+        max_workers: Optional[int] = None,
+    ) -> list[bool]:
+        """
+        Process several audio files in parallel using a pool of worker processes.
+
+        Args:
+            jobs: List of (input_file, output_file, programme_config) tuples
+            max_workers: Number of worker processes (defaults to CPU count)
+
+        Returns:
+            list: Processing result for each job, in the same order as jobs
+        """
+        if not jobs:
+            return []
+
+        cpu_count = os.cpu_count() or 1
+        workers = min(len(jobs), max_workers or cpu_count)
+        # Share the cores between the workers rather than letting every ffmpeg
+        # start one thread per core
+        threads_per_job = max(1, cpu_count // workers)
+        logging.info(
+            "Processing %d audio files with %d workers (%d threads each)",
+            len(jobs),
+            workers,
+            threads_per_job,
+        )
+
+        # Workers send their log records over a queue for the batch, and a
+        # listener passes them on to this process's loggers
+        mp_context = multiprocessing.get_context()
+        log_queue = mp_context.Queue()
+        listener = logging.handlers.QueueListener(log_queue, _ForwardHandler())
+        listener.start()
+        try:
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=mp_context,
+                initializer=_init_worker_logging,
+                initargs=(log_queue, logging.getLogger().level),
+            ) as executor:
+                return list(
+                    executor.map(
+                        partial(_process_job, self.config, threads_per_job),
+                        jobs,
+                        chunksize=1,
+                    )
+                )
+        finally:
+            listener.stop()
+            log_queue.close()
+
+    def process_many(self, jobs: list[tuple[Path, Path, Optional[dict]]]) -> list[bool]:
+        """
+        Process several audio files with as few ffmpeg runs as possible.
+
+        Up to 16 jobs share a single ffmpeg process, with one input and one output
+        per job, so the ffmpeg startup cost is paid once per batch rather than once
+        per file. Batches with long inputs are processed file by file instead, and
+        jobs from a failed combined run are retried on their own.
+
+        Args:
+            jobs: List of (input_file, output_file, programme_config) tuples
+
+        Returns:
+            list: Processing result for each job, in the same order as jobs
+        """
+        results = []
+        for start in range(0, len(jobs), _COMBINED_MAX_JOBS):
+            results.extend(
+                self._process_combined(jobs[start : start + _COMBINED_MAX_JOBS])
+            )
+        return results
+
+    def _process_combined(
+        self, jobs: list[tuple[Path, Path, Optional[dict]]]
+    ) -> list[bool]:
+        """Process a batch of jobs in a single ffmpeg run."""
+        durations = [self.get_duration(input_file) for input_file, _, _ in jobs]
+        if (
+            len(jobs) == 1
+            or any(duration is None for duration in durations)
+            or sum(duration or 0 for duration in durations) > _COMBINED_MAX_DURATION
+        ):
+            return [self.process_audio(*job) for job in jobs]
+
+        results: list[Optional[bool]] = [None] * len(jobs)
+        # Locked jobs in this run: job index -> (lock fd, lock file, temp file)
+        locked: dict[int, tuple[int, Path, Path]] = {}
+
+        try:
+            cmd = list(self._ffmpeg_base)
+            outputs = []
+
+            for index, (input_file, output_file, programme_config) in enumerate(jobs):
+                if output_file.exists():
+                    logging.info("Output file already exists: %s", output_file)
+                    results[index] = True
+                    continue
+
+                lock_file = self._lock_file_for(output_file)
+                lock_fd = self._acquire_lock(lock_file, output_file)
+                if lock_fd is None:
+                    results[index] = True
+                    continue
+
+                if output_file.exists():
+                    self._release_lock(lock_fd, lock_file)
+                    results[index] = True
+                    continue
+
+                unique_id = uuid.uuid4().hex[:8]
+                temp_file = output_file.with_suffix(f".processing.{unique_id}")
+                input_index = len(locked)
+                locked[index] = (lock_fd, lock_file, temp_file)
+
+                # Each job adds its own input, and an output mapped from that input
+                params = self._get_processing_params(programme_config)
+                if self._should_stream_copy(input_file, *params):
+                    cmd.extend(["-i", str(input_file)])
+                    output_args = self._build_copy_args(params[3])
+                else:
+                    source_args = self._build_source_args(input_file, *params[:2])
+                    cmd.extend(source_args)
+                    output_args = self._build_output_args(
+                        input_file, source_args, *params[2:]
+                    )
+                outputs.extend(["-map", f"{input_index}:a", *output_args])
+                outputs.append(str(temp_file))
+
+                logging.info("Processing audio: %s -> %s", input_file, output_file)
+
+            if locked:
+                cmd.extend(outputs)
+                logging.debug("FFmpeg command: %s", " ".join(cmd))
+                self._run_combined(cmd, jobs, locked, results)
+
+        finally:
+            for lock_fd, lock_file, _temp_file in locked.values():
+                self._release_lock(lock_fd, lock_file)
+
+        # Jobs the combined run failed on are retried on their own
+        return [
+            result if result is not None else self.process_audio(*job)
+            for result, job in zip(results, jobs)
+        ]
+
+    def _run_combined(
+        self,
+        cmd: list,
+        jobs: list[tuple[Path, Path, Optional[dict]]],
+        locked: dict[int, tuple[int, Path, Path]],
+        results: list[Optional[bool]],
+    ) -> None:
+        """Run a combined ffmpeg command and move each output into place."""
+        try:
+            result = subprocess.run(
+                cmd,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+                timeout=300 * len(locked),
+            )
+            if result.returncode != 0:
+                raise RuntimeError(result.stderr.decode(errors="replace"))
+
+        except Exception as e:
+            logging.warning(
+                "Combined audio processing failed, retrying per file: %s", e
+            )
+            for _lock_fd, _lock_file, temp_file in locked.values():
+                self._remove_temp_file(temp_file)
+            return
+
+        for index, (_lock_fd, _lock_file, temp_file) in locked.items():
+            output_file = jobs[index][1]
+            temp_file.replace(output_file)
+            logging.info("Audio processing completed: %s", output_file)
+            results[index] = True
 
     def _build_ffmpeg_command(
         self,
-        input_file: Path,
+        input_file: Optional[Path],
         output_file: Path,
         trim_start_seconds: float,
         trim_end_seconds: float,
         normalise_lufs: float | None,
         output_format: str,
     ) -> list:
-        """Build ffmpeg command with specified parameters."""
-        cmd = ["ffmpeg", "-y"]  # -y to overwrite output files
+        """
+        Build ffmpeg command with specified parameters.
 
-        # Input file
-        cmd.extend(["-i", str(input_file)])
+        An input_file of None reads the audio from stdin (pipe:0).
+        """
+        cmd = list(self._ffmpeg_base)
 
-        # Audio processing filters
-        filters = []
+        # Piped input can't be seeked, so an MP4 with its index at the end only
+        # yields demuxing errors - make those fail the run instead of producing an
+        # empty output
+        if input_file is None:
+            cmd.append("-xerror")
+
+        # Nothing to change in the audio itself - copy the stream instead of re-encoding
+        if self._should_stream_copy(
+            input_file,
+            trim_start_seconds,
+            trim_end_seconds,
+            normalise_lufs,
+            output_format,
+        ):
+            logging.debug("Stream copying %s without re-encoding", input_file)
+            cmd.extend(["-i", str(input_file), "-map", "0:a"])
+            cmd.extend(self._build_copy_args(output_format))
+            cmd.append(str(output_file))
+            return cmd
+
+        # Input file and trim settings, shared with the loudness measurement pass
+        source_args = self._build_source_args(
+            input_file, trim_start_seconds, trim_end_seconds
+        )
+        cmd.extend(source_args)
+
+        cmd.extend(
+            self._build_output_args(
+                input_file, source_args, normalise_lufs, output_format
+            )
+        )
+
+        # Output file
+        cmd.append(str(output_file))
+
+        return cmd
+
+    def _should_stream_copy(
+        self,
+        input_file: Optional[Path],
+        trim_start_seconds: float,
+        trim_end_seconds: float,
+        normalise_lufs: float | None,
+        output_format: str,
+    ) -> bool:
+        """Check if a job leaves the audio unchanged, so it can be stream copied."""
+        return (
+            trim_start_seconds <= 0
+            and trim_end_seconds <= 0
+            and normalise_lufs is None
+            and input_file is not None
+            and self._can_stream_copy(input_file, output_format)
+        )
+
+    def _build_copy_args(self, output_format: str) -> list:
+        """Build the output options for copying the audio stream as-is."""
+        return ["-c", "copy", "-vn", *self._build_format_args(output_format)]
 
-        # Trim from start if specified
+    def _build_format_args(self, output_format: str) -> list:
+        """Build the muxer options for an output format."""
+        # Explicitly specify output format to handle non-standard temporary file extensions
+        muxer = self._MUXERS.get(output_format, output_format)
+        return [*self._MUXER_ARGS.get(output_format, []), "-f", muxer]
+
+    def _build_source_args(
+        self,
+        input_file: Optional[Path],
+        trim_start_seconds: float,
+        trim_end_seconds: float,
+    ) -> list:
+        """Build the input options (trim and input file) for an ffmpeg command."""
+        input_arg = str(input_file) if input_file is not None else "pipe:0"
+        source_args = []
+
+        # Trim from start if specified - as an input option so ffmpeg seeks
+        # straight to the position instead of decoding and discarding the audio
         if trim_start_seconds > 0:
-            cmd.extend(["-ss", str(trim_start_seconds)])
+            source_args.extend(["-ss", str(trim_start_seconds)])
 
-        # Trim from end if specified (using -t duration instead of -to end time)
+        # Trim from end if specified (using -t duration instead of -to end time),
+        # also as an input option so it stays tied to this input in combined runs
         if trim_end_seconds > 0:
             # We need to calculate duration: original_duration - trim_start - trim_end
             # Get input duration first
-            input_duration = self.get_duration(input_file)
+            # (piped input can only be read once, so its duration is unknown)
+            input_duration = (
+                self.get_duration(input_file) if input_file is not None else None
+            )
             if input_duration:
                 target_duration = input_duration - trim_start_seconds - trim_end_seconds
                 if target_duration > 0:
-                    cmd.extend(["-t", str(target_duration)])
+                    source_args.extend(["-t", str(target_duration)])
                 else:
                     logging.warning(
-                        f"Calculated target duration ({target_duration}s) is invalid for {input_file}, skipping end trim"
+                        "Calculated target duration (%ss) is invalid for %s, skipping end trim",
+                        target_duration,
+                        input_file,
                     )
             else:
                 logging.warning(
-                    f"Could not determine duration of {input_file}, skipping end trim"
+                    "Could not determine duration of %s, skipping end trim",
+                    input_file,
                 )
 
+        # Input file
+        source_args.extend(["-i", input_arg])
+
+        return source_args
+
+    def _build_output_args(
+        self,
+        input_file: Optional[Path],
+        source_args: list,
+        normalise_lufs: float | None,
+        output_format: str,
+    ) -> list:
+        """Build the filter, codec and format options for one ffmpeg output."""
+        output_args = []
+
+        # Audio processing filters
+        filters = []
+
         # Normalise audio loudness if enabled with specific LUFS target
         if normalise_lufs is not None:
             # Use loudnorm filter for proper loudness normalisation
             # This normalises to the target LUFS level using EBU R128 algorithm
-            filters.append(f"loudnorm=I={normalise_lufs}:TP=-1.0:LRA=7.0")
+            loudnorm = f"loudnorm=I={normalise_lufs}:TP=-1.0:LRA=7.0"
+            # Piped input can't be read twice, so it is always normalised in one pass
+            if (
+                self.audio_config.get("normalise_mode", "loudnorm") == "loudnorm2pass"
+                and input_file is not None
+            ):
+                loudnorm = self._apply_loudness_measurement(loudnorm, source_args)
+            filters.append(loudnorm)
 
         # Apply filters if any
         if filters:
-            cmd.extend(["-af", ",".join(filters)])
-
-        # Audio codec and quality settings
-        if output_format == "mp3":
-            cmd.extend(["-codec:a", "libmp3lame"])
-            quality = self._get_mp3_quality()
-            cmd.extend(["-b:a", quality])
-        elif output_format == "m4a":
-            cmd.extend(["-codec:a", "aac"])
-            quality = self._get_aac_quality()
-            cmd.extend(["-b:a", quality])
-        elif output_format == "wav":
-            cmd.extend(["-codec:a", "pcm_s16le"])
+            output_args.extend(["-af", ",".join(filters)])
+
+        # Audio codec, quality and format settings
+        codec_tail = self._codec_tails.get(output_format)
+        if codec_tail is None:
+            codec_tail = self._build_codec_tail(output_format)
+        output_args.extend(codec_tail)
+
+        return output_args
+
+    def _build_codec_tail(self, output_format: str) -> list:
+        """Build the codec, bitrate and format options for an output format."""
+        codec_tail = list(self._CODEC_ARGS.get(output_format, []))
+        bitrate = self._get_bitrate(output_format)
+        if bitrate:
+            codec_tail.extend(["-b:a", bitrate])
+
+        # -threads before the inputs only limits the decoder, so limit the encoder
+        # with an output option too
+        if self.threads_per_job:
+            codec_tail.extend(["-threads", str(self.threads_per_job)])
 
         # Remove video streams (audio only)
-        cmd.extend(["-vn"])
+        codec_tail.append("-vn")
 
-        # Explicitly specify output format to handle non-standard temporary file extensions
-        cmd.extend(["-f", output_format])
+        codec_tail.extend(self._build_format_args(output_format))
 
-        # Output file
-        cmd.append(str(output_file))
+        return codec_tail
 
-        return cmd
+    def _ffmpeg_thread_args(self) -> list:
+        """Get the ffmpeg threading options for this processor."""
+        if not self.threads_per_job:
+            return []
+        threads = str(self.threads_per_job)
+        return ["-threads", threads, "-filter_threads", threads]
 
-    def _get_mp3_quality(self) -> str:
-        """Get MP3 bitrate based on quality setting."""
-        quality_map = {"high": "320k", "std": "192k", "med": "128k", "low": "96k"}
+    def _apply_loudness_measurement(self, loudnorm: str, source_args: list) -> str:
+        """
+        Run a loudnorm analysis pass and add the measured values to the filter.
+
+        With measured values loudnorm can apply a single linear gain, which is more
+        accurate than the dynamic single-pass mode. Falls back to the single-pass
+        filter if the measurement fails.
+        """
+        # loudnorm prints its measurement at info level, so keep the default loglevel
+        cmd = ["ffmpeg", "-nostdin", "-hide_banner", "-nostats"]
+        cmd.extend([*self._ffmpeg_thread_args(), *source_args])
+        cmd.extend(["-af", f"{loudnorm}:print_format=json", "-vn", "-f", "null", "-"])
+
+        try:
+            result = subprocess.run(
+                cmd,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+                text=True,
+                errors="replace",
+                timeout=300,
+            )
+            if result.returncode != 0:
+                raise RuntimeError(result.stderr)
+
+            # The measurement is the last JSON object in the output
+            stderr = result.stderr
+            measured = _json.loads(stderr[stderr.rindex("{") : stderr.rindex("}") + 1])
+
+            return (
+                f"{loudnorm}:measured_I={measured['input_i']}"
+                f":measured_TP={measured['input_tp']}"
+                f":measured_LRA={measured['input_lra']}"
+                f":measured_thresh={measured['input_thresh']}"
+                f":offset={measured['target_offset']}:linear=true"
+            )
+
+        except Exception as e:
+            logging.warning(
+                "Loudness measurement failed, using single-pass normalisation: %s", e
+            )
+            return loudnorm
+
+    def _can_stream_copy(self, input_file: Path, output_format: str) -> bool:
+        """Check if the input audio can be copied as-is into the output format."""
+        # Cheap extension check first, so mismatched formats never need a probe
+        copy_extensions = {"mp3": (".mp3",), "m4a": (".m4a", ".mp4"), "wav": (".wav",)}
+        if input_file.suffix.lower() not in copy_extensions.get(output_format, ()):
+            return False
+
+        audio_info = self.get_audio_info(input_file)
+        if not audio_info:
+            return False
+
+        stream = next(
+            (
+                s
+                for s in audio_info.get("streams", [])
+                if s.get("codec_type") == "audio"
+            ),
+            None,
+        )
+        if stream is None:
+            return False
+
+        copy_codecs = {"mp3": "mp3", "m4a": "aac", "wav": "pcm_s16le"}
+        if stream.get("codec_name") != copy_codecs[output_format]:
+            return False
+
+        # PCM is lossless, compressed sources must not exceed the requested bitrate
+        if output_format == "wav":
+            return True
+
+        requested = self._get_bitrate(output_format)
+        try:
+            source_bitrate = int(stream["bit_rate"])
+        except (KeyError, TypeError, ValueError):
+            return False
+
+        return requested is not None and source_bitrate <= int(requested[:-1]) * 1000
+
+    def _get_bitrate(self, output_format: str) -> Optional[str]:
+        """Get the bitrate for an output format (None for uncompressed formats)."""
+        quality_map = self._QUALITY_TABLE.get(output_format)
+        if quality_map is None:
+            return None
         quality = self.audio_config.get("quality", "high")
-        return quality_map.get(quality, "192k")
+        return quality_map.get(quality, self._DEFAULT_BITRATE[output_format])
+
+    def _get_mp3_quality(self) -> str:
+        """Get MP3 bitrate based on quality setting (use _get_bitrate)."""
+        return self._get_bitrate("mp3") or self._DEFAULT_BITRATE["mp3"]
 
     def _get_aac_quality(self) -> str:
-        """Get AAC bitrate based on quality setting."""
-        quality_map = {"high": "256k", "std": "128k", "med": "96k", "low": "64k"}
-        quality = self.audio_config.get("quality", "high")
-        return quality_map.get(quality, "128k")
+        """Get AAC bitrate based on quality setting (use _get_bitrate)."""
+        return self._get_bitrate("m4a") or self._DEFAULT_BITRATE["m4a"]
 
     def get_audio_info(self, file_path: Path) -> Optional[dict]:
-        """Get audio file information using ffprobe."""
+        """Get audio file information using ffprobe (cached until the file changes)."""
+        try:
+            # Convert the path once for both the stat and the cache key
+            path_str = os.fspath(file_path)
+            st = os.stat(path_str)
+            return copy.deepcopy(_probe(path_str, st.st_mtime_ns, st.st_size))
+
+        except Exception as e:
+            logging.error("Failed to get audio info: %s", e)
+            return None
+
+    async def get_audio_info_async(self, file_path: Path) -> Optional[dict]:
+        """Get audio file information using ffprobe without blocking the event loop."""
         try:
-            cmd = [
-                "ffprobe",
-                "-v",
-                "quiet",
-                "-print_format",
-                "json",
-                "-show_format",
-                "-show_streams",
-                str(file_path),
-            ]
-
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-
-            if result.returncode == 0:
-                import json
-
-                return json.loads(result.stdout)
+            cmd = self._build_ffprobe_command(file_path)
+
+            returncode, stdout, stderr = await self._run_ffmpeg(cmd, timeout=30)
+
+            if returncode == 0:
+                return _json.loads(stdout)
             else:
-                logging.error(f"ffprobe failed: {result.stderr}")
+                logging.error("ffprobe failed: %s", stderr.decode(errors="replace"))
                 return None
 
         except Exception as e:
-            logging.error(f"Failed to get audio info: {e}")
+            logging.error("Failed to get audio info: %s", e)
             return None
 
+    def _build_ffprobe_command(self, file_path: Path) -> list:
+        """Build ffprobe command to read format and stream information as JSON."""
+        return ["ffprobe", *_FFPROBE_ARGS, str(file_path)]
+
     def validate_audio_file(self, file_path: Path) -> bool:
         """Validate that the file is a valid audio file."""
         if not file_path.exists():
             return False
 
+        # A parsed header with a positive length proves there is an audio stream
+        length = self._get_mutagen_length(file_path)
+        if length is not None:
+            return length > 0
+
         audio_info = self.get_audio_info(file_path)
         if not audio_info:
             return False
@@ -292,8 +1015,60 @@ class AudioProcessor:
 
         return len(audio_streams) > 0
 
+    def validate_batch(self, paths: list[Path]) -> list[bool]:
+        """
+        Validate many audio files at once.
+
+        Files that are missing or empty are rejected without running ffprobe.
+        The rest are validated concurrently, as validate_audio_file would.
+
+        Returns:
+            list: Validation result for each path, in the same order as paths
+        """
+        candidates = [path for path in paths if self._has_content(path)]
+        if not candidates:
+            return [False] * len(paths)
+
+        workers = min(len(candidates), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            valid = dict(
+                zip(candidates, executor.map(self.validate_audio_file, candidates))
+            )
+
+        return [valid.get(path, False) for path in paths]
+
+    def _has_content(self, file_path: Path) -> bool:
+        """Check if a file exists and isn't empty."""
+        try:
+            return os.stat(file_path).st_size > 0
+        except OSError:
+            return False
+
     def get_duration(self, file_path: Path) -> Optional[float]:
         """Get audio file duration in seconds."""
+        length = self._get_mutagen_length(file_path)
+        if length is not None:
+            return length
+
+        return self._get_duration_ffprobe(file_path)
+
+    def _get_mutagen_length(self, file_path: Path) -> Optional[float]:
+        """
+        Read the audio length from the container header with mutagen.
+
+        Returns None when mutagen is not installed, the container is not one it
+        handles reliably, or parsing fails, so the caller can fall back to ffprobe.
+        """
+        if MutagenFile is None or file_path.suffix.lower() not in _MUTAGEN_SUFFIXES:
+            return None
+
+        try:
+            return float(MutagenFile(str(file_path)).info.length)
+        except Exception:
+            return None
+
+    def _get_duration_ffprobe(self, file_path: Path) -> Optional[float]:
+        """Get audio file duration in seconds using ffprobe."""
         audio_info = self.get_audio_info(file_path)
         if not audio_info:
             return None
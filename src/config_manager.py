@@ -4,108 +4,21 @@ Handles loading and validation of application configuration.
 """
 
 import logging
+import os
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 
-import yaml
+_log = logging.getLogger(__name__)
 
+# Validation rules
+_REQUIRED_SECTIONS = ("programmes", "audio", "scheduler", "output")
+_PROGRAMME_REQUIRED_FIELDS = frozenset(("name", "url"))
+_VALID_NORMALISE_MODES = frozenset(("loudnorm", "loudnorm2pass"))
+_VALID_QUALITIES = frozenset(("high", "std", "med", "low"))
+_VALID_FORMATS = frozenset(("mp3", "m4a", "wav"))
 
-class ConfigManager:
-    """Manages application configuration loading and validation."""
-
-    DEFAULT_CONFIG_PATHS = [
-        "./config/config-local.yaml",  # Local development first
-        "./config/config.yaml",
-        "./config.yaml",
-        "/app/config/config.yaml",  # Docker paths last
-        "/app/config.yaml",
-    ]
-
-    def __init__(self, config_path: Optional[str] = None):
-        self.config_path = config_path
-        self.config: Dict[str, Any] = {}
-
-    def load_config(self) -> Optional[Dict[str, Any]]:
-        """Load configuration from YAML file."""
-        config_file = self._find_config_file()
-
-        if not config_file:
-            logging.warning("No configuration file found")
-            # Generate a template config file
-            template_path = self._generate_template_config()
-            if template_path:
-                logging.info(f"Generated template configuration file: {template_path}")
-                logging.info(
-                    "Please edit the configuration file and restart the application"
-                )
-                return None
-            else:
-                logging.error("Failed to generate template configuration file")
-                return None
-
-        try:
-            with open(config_file, "r", encoding="utf-8") as f:
-                self.config = yaml.safe_load(f)
-
-            logging.info(f"Configuration loaded from {config_file}")
-
-            # Validate configuration
-            if self._validate_config():
-                return self.config
-            else:
-                logging.error("Configuration validation failed")
-                return None
-
-        except yaml.YAMLError as e:
-            logging.error(f"Failed to parse YAML config: {e}")
-            return None
-        except Exception as e:
-            logging.error(f"Failed to load config: {e}")
-            return None
-
-    def _find_config_file(self) -> Optional[Path]:
-        """Find the configuration file."""
-        if self.config_path:
-            config_path = Path(self.config_path)
-            if config_path.exists():
-                return config_path
-            else:
-                logging.error(f"Specified config file not found: {self.config_path}")
-                return None
-
-        # Try default paths
-        for path_str in self.DEFAULT_CONFIG_PATHS:
-            path = Path(path_str)
-            if path.exists():
-                return path
-
-        return None
-
-    def _generate_template_config(self) -> Optional[Path]:
-        """Generate a template configuration file."""
-        try:
-            # Determine best path for template
-            template_path = Path("./config/config.yaml")
-
-            # Create config directory if it doesn't exist
-            template_path.parent.mkdir(parents=True, exist_ok=True)
-
-            # Generate template content
-            template_content = self._get_template_content()
-
-            # Write template file
-            with open(template_path, "w", encoding="utf-8") as f:
-                f.write(template_content)
-
-            return template_path
-
-        except Exception as e:
-            logging.error(f"Failed to generate template config: {e}")
-            return None
-
-    def _get_template_content(self) -> str:
-        """Get template configuration content."""
-        return """# BBC News Bulletin Scraper Configuration Template
+# Configuration template written when no configuration file is found
+_TEMPLATE_CONTENT = """# BBC News Bulletin Scraper Configuration Template
 # Please customize this configuration for your needs
 
 # Application Settings
@@ -153,6 +66,11 @@ audio:
   # Set to null to disable normalisation completely
   normalise_lufs: -16
 
+  # Normalisation method
+  # loudnorm = single pass (faster)
+  # loudnorm2pass = measure loudness first, then apply (more accurate, slower)
+  normalise_mode: "loudnorm"
+
 # Scheduling Configuration
 scheduler:
   # Download at these minutes past each hour
@@ -237,161 +155,330 @@ get_iplayer:
 
 """
 
-    def _validate_config(self) -> bool:
-        """Validate the loaded configuration."""
-        try:
-            # Check required top-level sections
-            required_sections = ["programmes", "audio", "scheduler", "output"]
-            for section in required_sections:
-                if section not in self.config:
-                    logging.error(f"Missing required config section: {section}")
-                    return False
 
-            # Validate programmes
-            if not self._validate_programmes():
-                return False
+def _file_exists(path: Path) -> bool:
+    """Check if a path exists with a single stat call."""
+    try:
+        os.stat(path)
+        return True
+    except OSError:
+        return False
 
-            # Validate audio settings
-            if not self._validate_audio():
-                return False
 
-            # Validate scheduler settings
-            if not self._validate_scheduler():
-                return False
+def _flatten(config: Any, prefix: str = "") -> Dict[str, Any]:
+    """Map every dot-notation key in a nested config to its value."""
+    flat: Dict[str, Any] = {}
+    if isinstance(config, dict):
+        for key, value in config.items():
+            dotted = f"{prefix}{key}"
+            flat[dotted] = value
+            flat.update(_flatten(value, f"{dotted}."))
+    return flat
 
-            # Validate output settings
-            if not self._validate_output():
-                return False
 
-            logging.info("Configuration validation passed")
-            return True
+class ConfigManager:
+    """Manages application configuration loading and validation."""
+
+    DEFAULT_CONFIG_PATHS = [
+        "./config/config-local.yaml",  # Local development first
+        "./config/config.yaml",
+        "./config.yaml",
+        "/app/config/config.yaml",  # Docker paths last
+        "/app/config.yaml",
+    ]
+    _DEFAULT_PATHS = tuple(Path(path_str) for path_str in DEFAULT_CONFIG_PATHS)
+
+    def __init__(self, config_path: Optional[str] = None):
+        self.config_path = config_path
+        self.config: Dict[str, Any] = {}
+        # Parsed configs by file: (mtime_ns, size) they were read at, the config,
+        # and whether it passed validation
+        self._cache: Dict[Path, Tuple[int, int, Dict[str, Any], bool]] = {}
+        # Config file found by the last search, checked first next time
+        self._resolved_path: Optional[Path] = None
+        # Dot-notation lookup table for get(), and the config it was built from
+        self._flat: Dict[str, Any] = {}
+        self._flat_source: Optional[Dict[str, Any]] = None
+
+    def load_config(self) -> Optional[Dict[str, Any]]:
+        """Load configuration from YAML file."""
+        config_file = self._find_config_file()
+
+        if not config_file:
+            _log.warning("No configuration file found")
+            # Generate a template config file
+            template_path = self._generate_template_config()
+            if template_path:
+                _log.info("Generated template configuration file: %s", template_path)
+                _log.info(
+                    "Please edit the configuration file and restart the application"
+                )
+                return None
+            else:
+                _log.error("Failed to generate template configuration file")
+                return None
+
+        # Imported on first load, as nothing else needs yaml
+        import yaml
 
+        try:
+            # An unchanged file needs no parsing or validation
+            st = config_file.stat()
+            cached = self._cache.get(config_file)
+            if cached and cached[:2] == (st.st_mtime_ns, st.st_size):
+                self.config = cached[2]
+                if cached[3]:
+                    return self.config
+                _log.error("Configuration validation failed")
+                return None
+
+            # Use the LibYAML-based loader when PyYAML was built with it
+            try:
+                from yaml import CSafeLoader as SafeLoader
+            except ImportError:
+                from yaml import SafeLoader  # type: ignore[assignment]
+
+            # Parsed from bytes, the YAML loader detects the encoding itself
+            with open(config_file, "rb") as f:
+                self.config = yaml.load(f, Loader=SafeLoader)
+
+            _log.info("Configuration loaded from %s", config_file)
+
+            # Validate configuration, remembering the result for this file version
+            is_valid = self._validate_config()
+            self._cache[config_file] = (
+                st.st_mtime_ns,
+                st.st_size,
+                self.config,
+                is_valid,
+            )
+            if is_valid:
+                return self.config
+            else:
+                _log.error("Configuration validation failed")
+                return None
+
+        except yaml.YAMLError as e:
+            _log.error("Failed to parse YAML config: %s", e)
+            return None
         except Exception as e:
-            logging.error(f"Configuration validation error: {e}")
+            _log.error("Failed to load config: %s", e)
+            return None
+
+    def reload_if_changed(self) -> bool:
+        """
+        Reload the configuration if its file changed since it was last loaded.
+
+        Returns:
+            bool: True if a changed configuration was loaded and is valid
+        """
+        config_file = self._find_config_file()
+        if not config_file:
             return False
 
-    def _validate_programmes(self) -> bool:
-        """Validate programmes configuration."""
-        programmes = self.config.get("programmes", [])
+        try:
+            st = config_file.stat()
+        except OSError as e:
+            _log.error("Failed to check config file: %s", e)
+            return False
 
-        if not programmes:
-            logging.error("No programmes configured")
+        cached = self._cache.get(config_file)
+        if cached and cached[:2] == (st.st_mtime_ns, st.st_size):
             return False
 
-        for i, programme in enumerate(programmes):
-            if not isinstance(programme, dict):
-                logging.error(f"Programme {i} is not a dictionary")
-                return False
+        return self.load_config() is not None
+
+    def _find_config_file(self) -> Optional[Path]:
+        """Find the configuration file."""
+        # The file found last time is the usual answer
+        if self._resolved_path and _file_exists(self._resolved_path):
+            return self._resolved_path
+
+        if self.config_path:
+            config_path = Path(self.config_path)
+            if _file_exists(config_path):
+                self._resolved_path = config_path
+                return config_path
+            else:
+                _log.error("Specified config file not found: %s", self.config_path)
+                return None
+
+        # Try default paths
+        for path in self._DEFAULT_PATHS:
+            if _file_exists(path):
+                self._resolved_path = path
+                return path
+
+        return None
+
+    def _generate_template_config(self) -> Optional[Path]:
+        """Generate a template configuration file."""
+        try:
+            # Determine best path for template
+            template_path = Path("./config/config.yaml")
+
+            # Create config directory if it doesn't exist
+            if not template_path.parent.is_dir():
+                template_path.parent.mkdir(parents=True, exist_ok=True)
+
+            # Write template file via a temporary file, so an interrupted write
+            # can't leave a truncated config behind
+            temp_path = template_path.with_suffix(".yaml.tmp")
+            try:
+                temp_path.write_text(_TEMPLATE_CONTENT, encoding="utf-8")
+                os.replace(temp_path, template_path)
+            except BaseException:
+                temp_path.unlink(missing_ok=True)
+                raise
 
-            required_fields = ["name", "url"]
-            for field in required_fields:
-                if field not in programme:
-                    logging.error(f"Programme {i} missing required field: {field}")
+            return template_path
+
+        except Exception as e:
+            _log.error("Failed to generate template config: %s", e)
+            return None
+
+    def _validate_config(self) -> bool:
+        """Validate the loaded configuration in a single pass."""
+        try:
+            config = self.config
+
+            # Check required top-level sections
+            for section in _REQUIRED_SECTIONS:
+                if section not in config:
+                    _log.error("Missing required config section: %s", section)
                     return False
 
-        return True
+            programmes = config["programmes"]
+            audio = config["audio"]
+            scheduler = config["scheduler"]
+            output = config["output"]
 
-    def _validate_audio(self) -> bool:
-        """Validate audio configuration."""
-        audio = self.config.get("audio", {})
+            # Validate programmes
+            if not programmes:
+                _log.error("No programmes configured")
+                return False
 
-        # Check trim_start_seconds is non-negative number
-        trim_start_seconds = audio.get("trim_start_seconds", 0)
-        if not isinstance(trim_start_seconds, (int, float)) or trim_start_seconds < 0:
-            logging.error("trim_start_seconds must be a non-negative number")
-            return False
+            for i, programme in enumerate(programmes):
+                if not isinstance(programme, dict):
+                    _log.error("Programme %d is not a dictionary", i)
+                    return False
 
-        # Check trim_end_seconds is non-negative number
-        trim_end_seconds = audio.get("trim_end_seconds", 0)
-        if not isinstance(trim_end_seconds, (int, float)) or trim_end_seconds < 0:
-            logging.error("trim_end_seconds must be a non-negative number")
-            return False
+                if not _PROGRAMME_REQUIRED_FIELDS.issubset(programme):
+                    missing = ", ".join(
+                        sorted(_PROGRAMME_REQUIRED_FIELDS - programme.keys())
+                    )
+                    _log.error("Programme %d missing required field: %s", i, missing)
+                    return False
 
-        # Check normalise_lufs is valid (number or None/False)
-        normalise_lufs = audio.get("normalise_lufs")
-        if normalise_lufs is not None and not isinstance(normalise_lufs, (int, float)):
-            # Check for legacy boolean setting
-            legacy_bool = audio.get("normalise") or audio.get("normalize")
-            if legacy_bool is None or not isinstance(legacy_bool, bool):
-                logging.error("normalise_lufs must be a number or null")
+            # Validate audio settings
+            # Check trim_start_seconds is non-negative number
+            trim_start_seconds = audio.get("trim_start_seconds", 0)
+            if (
+                not isinstance(trim_start_seconds, (int, float))
+                or trim_start_seconds < 0
+            ):
+                _log.error("trim_start_seconds must be a non-negative number")
                 return False
 
-        # Validate LUFS range (typical broadcast range is -14 to -31 LUFS)
-        if normalise_lufs is not None and (
-            normalise_lufs > -14 or normalise_lufs < -31
-        ):
-            logging.warning(
-                f"normalise_lufs value {normalise_lufs} is outside typical broadcast range (-14 to -31 LUFS)"
-            )
+            # Check trim_end_seconds is non-negative number
+            trim_end_seconds = audio.get("trim_end_seconds", 0)
+            if not isinstance(trim_end_seconds, (int, float)) or trim_end_seconds < 0:
+                _log.error("trim_end_seconds must be a non-negative number")
+                return False
 
-        # Check quality is valid
-        valid_qualities = ["high", "std", "med", "low"]
-        quality = audio.get("quality", "high")
-        if quality not in valid_qualities:
-            logging.error(
-                f"Invalid audio quality: {quality}. Must be one of {valid_qualities}"
-            )
-            return False
+            # Check normalise_lufs is valid (number or None/False)
+            normalise_lufs = audio.get("normalise_lufs")
+            if normalise_lufs is not None and not isinstance(
+                normalise_lufs, (int, float)
+            ):
+                # Check for legacy boolean setting
+                legacy_bool = audio.get("normalise") or audio.get("normalize")
+                if legacy_bool is None or not isinstance(legacy_bool, bool):
+                    _log.error("normalise_lufs must be a number or null")
+                    return False
 
-        # Check format is valid
-        valid_formats = ["mp3", "m4a", "wav"]
-        format_type = audio.get("format", "mp3")
-        if format_type not in valid_formats:
-            logging.error(
-                f"Invalid audio format: {format_type}. Must be one of {valid_formats}"
-            )
-            return False
+            # Validate LUFS range (typical broadcast range is -14 to -31 LUFS)
+            if normalise_lufs is not None and (
+                normalise_lufs > -14 or normalise_lufs < -31
+            ):
+                _log.warning(
+                    "normalise_lufs value %s is outside typical broadcast range (-14 to -31 LUFS)",
+                    normalise_lufs,
+                )
 
-        return True
+            # Check normalise_mode is valid
+            normalise_mode = audio.get("normalise_mode", "loudnorm")
+            if normalise_mode not in _VALID_NORMALISE_MODES:
+                _log.error(
+                    "Invalid normalise_mode: %s. Must be one of %s",
+                    normalise_mode,
+                    sorted(_VALID_NORMALISE_MODES),
+                )
+                return False
 
-    def _validate_scheduler(self) -> bool:
-        """Validate scheduler configuration."""
-        scheduler = self.config.get("scheduler", {})
+            # Check quality is valid
+            quality = audio.get("quality", "high")
+            if quality not in _VALID_QUALITIES:
+                _log.error(
+                    "Invalid audio quality: %s. Must be one of %s",
+                    quality,
+                    sorted(_VALID_QUALITIES),
+                )
+                return False
 
-        # Check minutes_past_hour
-        minutes = scheduler.get("minutes_past_hour", [])
-        if not isinstance(minutes, list) or not minutes:
-            logging.error("minutes_past_hour must be a non-empty list")
-            return False
+            # Check format is valid
+            format_type = audio.get("format", "mp3")
+            if format_type not in _VALID_FORMATS:
+                _log.error(
+                    "Invalid audio format: %s. Must be one of %s",
+                    format_type,
+                    sorted(_VALID_FORMATS),
+                )
+                return False
 
-        for minute in minutes:
-            if not isinstance(minute, int) or minute < 0 or minute >= 60:
-                logging.error(f"Invalid minute value: {minute}. Must be 0-59")
+            # Validate scheduler settings
+            # Check minutes_past_hour
+            minutes = scheduler.get("minutes_past_hour", [])
+            if not isinstance(minutes, list) or not minutes:
+                _log.error("minutes_past_hour must be a non-empty list")
                 return False
 
-        # Check hour ranges
-        start_hour = scheduler.get("start_hour", 0)
-        end_hour = scheduler.get("end_hour", 23)
+            if not all(
+                isinstance(m, int) and not isinstance(m, bool) and 0 <= m <= 59
+                for m in minutes
+            ):
+                _log.error("Invalid minute values: %s. Must be 0-59", minutes)
+                return False
 
-        if not 0 <= start_hour <= 23 or not 0 <= end_hour <= 23:
-            logging.error("start_hour and end_hour must be 0-23")
-            return False
+            # Check hour ranges
+            start_hour = scheduler.get("start_hour", 0)
+            end_hour = scheduler.get("end_hour", 23)
 
-        return True
+            if not 0 <= start_hour <= 23 or not 0 <= end_hour <= 23:
+                _log.error("start_hour and end_hour must be 0-23")
+                return False
 
-    def _validate_output(self) -> bool:
-        """Validate output configuration."""
-        output = self.config.get("output", {})
+            # Validate output settings
+            # Check base_path exists
+            if "base_path" not in output:
+                _log.error("output.base_path is required")
+                return False
 
-        # Check base_path exists
-        if "base_path" not in output:
-            logging.error("output.base_path is required")
-            return False
+            _log.info("Configuration validation passed")
+            return True
 
-        return True
+        except Exception as e:
+            _log.error("Configuration validation error: %s", e)
+            return False
 
     def get(self, key: str, default: Any = None) -> Any:
         """Get a configuration value using dot notation."""
-        keys = key.split(".")
-        value = self.config
-
-        for k in keys:
-            if isinstance(value, dict) and k in value:
-                value = value[k]
-            else:
-                return default
+        # Rebuilt whenever a different config has been loaded
+        if self._flat_source is not self.config:
+            self._flat = _flatten(self.config)
+            self._flat_source = self.config
 
-        return value
+        return self._flat.get(key, default)
 
     def has_valid_config(self) -> bool:
         """Check if a valid configuration file exists."""
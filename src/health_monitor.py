@@ -3,13 +3,46 @@ Health Monitoring Module for BBC News Bulletin Scraper
 Provides health checks and monitoring capabilities.
 """
 
+import hashlib
 import json
 import logging
+import os
+import shutil
 import threading
+import time
 from datetime import datetime
-from http.server import BaseHTTPRequestHandler, HTTPServer
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Callable, Dict, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+
+
+def _dumps(data: dict) -> bytes:
+    """Serialise a response body as indented JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2).encode()
+
+
+def _encode(data: dict) -> Tuple[bytes, str]:
+    """Serialise a response body and compute its ETag."""
+    body = _dumps(data)
+    return body, '"' + hashlib.blake2b(body, digest_size=8).hexdigest() + '"'
+
+
+# Fallback where os.statvfs isn't available (Windows)
+_disk_usage = shutil.disk_usage
+
+# Seconds each endpoint's result is reused for, so frequent probes stay cheap
+_HEALTH_TTL = 10.0
+_STATUS_TTL = 10.0
+_METRICS_TTL = 5.0
+_DISK_TTL = 10.0
 
 
 def _get_environment_default_path(path_type: str) -> str:
@@ -27,46 +60,114 @@ def _get_environment_default_path(path_type: str) -> str:
     return str(Path.cwd() / path_type)
 
 
+# Message prefix for each disk space check status
+_DISK_MESSAGES = {
+    "fail": "Low disk space",
+    "warn": "Disk space warning",
+    "pass": "Disk space OK",
+}
+
+
+@lru_cache(maxsize=64)
+def _disk_space_check(status: str, free_text: str) -> Dict[str, Any]:
+    """Build the disk space check result (shared between calls, copy before use)."""
+    return {
+        "name": "disk_space",
+        "status": status,
+        "message": f"{_DISK_MESSAGES[status]}: {free_text} free",
+    }
+
+
+@lru_cache(maxsize=64)
+def _recent_errors_check(error_count: int) -> Dict[str, Any]:
+    """Build the recent errors check result (shared between calls, copy before use)."""
+    # Simple implementation - could be enhanced to read log files
+    if error_count > 10:  # Arbitrary threshold
+        return {
+            "name": "recent_errors",
+            "status": "fail",
+            "message": f"High error count: {error_count} errors",
+        }
+    elif error_count > 5:
+        return {
+            "name": "recent_errors",
+            "status": "warn",
+            "message": f"Moderate error count: {error_count} errors",
+        }
+    else:
+        return {
+            "name": "recent_errors",
+            "status": "pass",
+            "message": f"Error count OK: {error_count} errors",
+        }
+
+
 class HealthCheckHandler(BaseHTTPRequestHandler):
     """HTTP request handler for health checks."""
 
+    # Keep connections open between probes (every response sets Content-Length)
+    protocol_version = "HTTP/1.1"
+
+    # Request path -> name of the method that handles it
+    _ROUTES = {
+        "/health": "_handle_health_check",
+        "/status": "_handle_status_check",
+        "/metrics": "_handle_metrics",
+    }
+
     def __init__(self, health_monitor, *args, **kwargs):
         self.health_monitor = health_monitor
         super().__init__(*args, **kwargs)
 
     def do_GET(self):
         """Handle GET requests."""
-        if self.path == "/health":
-            self._handle_health_check()
-        elif self.path == "/status":
-            self._handle_status_check()
-        elif self.path == "/metrics":
-            self._handle_metrics()
+        handler = self._ROUTES.get(self.path)
+        if handler:
+            getattr(self, handler)()
         else:
             self._send_response(404, {"error": "Not found"})
 
+    def do_HEAD(self):
+        """Handle HEAD requests (as GET, but headers only)."""
+        self.do_GET()
+
     def _handle_health_check(self):
         """Handle basic health check."""
-        health_status = self.health_monitor.get_health_status()
+        health_status, body, etag = self.health_monitor.get_response("health")
         status_code = 200 if health_status["healthy"] else 503
-        self._send_response(status_code, health_status)
+        self._send_body(status_code, body, etag)
 
     def _handle_status_check(self):
         """Handle detailed status check."""
-        status = self.health_monitor.get_detailed_status()
-        self._send_response(200, status)
+        _status, body, etag = self.health_monitor.get_response("status")
+        self._send_body(200, body, etag)
 
     def _handle_metrics(self):
         """Handle metrics endpoint."""
-        metrics = self.health_monitor.get_metrics()
-        self._send_response(200, metrics)
+        _metrics, body, etag = self.health_monitor.get_response("metrics")
+        self._send_body(200, body, etag)
 
     def _send_response(self, status_code: int, data: dict):
         """Send JSON response."""
+        self._send_body(status_code, *_encode(data))
+
+    def _send_body(self, status_code: int, body: bytes, etag: str):
+        """Send an encoded JSON body, or 304 if the client already has it."""
+        if_none_match = self.headers.get("If-None-Match")
+        if status_code == 200 and if_none_match:
+            if etag in (tag.strip() for tag in if_none_match.split(",")):
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+
         self.send_response(status_code)
         self.send_header("Content-type", "application/json")
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
         self.end_headers()
-        self.wfile.write(json.dumps(data, indent=2).encode())
+        if self.command != "HEAD":
+            self.wfile.write(body)
 
     def log_message(self, format, *args):
         """Override to suppress access logs."""
@@ -87,6 +188,39 @@ class HealthMonitor:
         self.last_check: datetime | None = None
         self.error_count = 0
         self.warning_count = 0
+        # Counters are updated from the scheduler and HTTP server threads
+        self._counter_lock = threading.Lock()
+
+        # Config doesn't change after load, so read what the endpoints report once
+        app_config = config.get("app", {})
+        audio_config = config.get("audio", {})
+        output_config = config.get("output", {})
+        self._app_name = app_config.get("name", "BBC News Bulletin Scraper")
+        self._app_version = app_config.get("version", "1.0.0")
+        self._start_time_iso = self.start_time.isoformat()
+        self._configured_output_path = output_config.get("base_path")
+        self._output_path = self._configured_output_path or (
+            _get_environment_default_path("output")
+        )
+        self._trim_seconds = (
+            audio_config.get("trim_start_seconds", 0),
+            audio_config.get("trim_end_seconds", 0),
+        )
+        self._normalise_lufs = audio_config.get("normalise_lufs", None)
+        self._programmes_enabled_count = sum(
+            1 for p in config.get("programmes", []) if p.get("enabled", True)
+        )
+
+        # Recently computed results: key -> (monotonic time, result, body, etag)
+        self._cache: Dict[str, Tuple[float, Dict[str, Any], bytes, str]] = {}
+        self._endpoints: Dict[str, Tuple[float, Callable[[], Dict[str, Any]]]] = {
+            "health": (_HEALTH_TTL, self._compute_health_status),
+            "status": (_STATUS_TTL, self._compute_detailed_status),
+            "metrics": (_METRICS_TTL, self._compute_metrics),
+        }
+        self._cache_lock = threading.Lock()
+        # Last disk reading: (monotonic time, (total, used, free))
+        self._disk: Tuple[float, Tuple[int, int, int]] | None = None
 
         # HTTP server for health checks
         self.http_server = None
@@ -104,7 +238,10 @@ class HealthMonitor:
             def handler(*args, **kwargs):
                 return HealthCheckHandler(self, *args, **kwargs)
 
-            self.http_server = HTTPServer(("0.0.0.0", port), handler)
+            # One thread per connection, so a slow request doesn't hold up probes
+            self.http_server = ThreadingHTTPServer(("0.0.0.0", port), handler)
+            # Don't let open keep-alive connections delay shutdown
+            self.http_server.daemon_threads = True
 
             # Start server in background thread
             self.server_thread = threading.Thread(
@@ -112,10 +249,10 @@ class HealthMonitor:
             )
             self.server_thread.start()
 
-            logging.info(f"Health check server started on port {port}")
+            logging.info("Health check server started on port %s", port)
 
         except Exception as e:
-            logging.error(f"Failed to start health check server: {e}")
+            logging.error("Failed to start health check server: %s", e)
 
     def stop_http_server(self):
         """Stop the HTTP server."""
@@ -128,9 +265,48 @@ class HealthMonitor:
 
             logging.info("Health check server stopped")
 
+    def get_response(self, key: str) -> Tuple[Dict[str, Any], bytes, str]:
+        """Return an endpoint's result with its encoded body and ETag.
+
+        Results are reused for a few seconds, and are serialised only when
+        they are computed.
+        """
+        ttl, compute = self._endpoints[key]
+        now = time.monotonic()
+        with self._cache_lock:
+            hit = self._cache.get(key)
+        if hit and now - hit[0] < ttl:
+            return hit[1], hit[2], hit[3]
+
+        # Computed outside the lock, as results may depend on other cached results
+        result = compute()
+        body, etag = _encode(result)
+        with self._cache_lock:
+            self._cache[key] = (now, result, body, etag)
+        return result, body, etag
+
     def get_health_status(self) -> Dict[str, Any]:
+        """Get basic health status (cached for a few seconds)."""
+        return self.get_response("health")[0]
+
+    def get_detailed_status(self) -> Dict[str, Any]:
+        """Get detailed application status (cached for a few seconds)."""
+        return self.get_response("status")[0]
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get application metrics (cached for a few seconds)."""
+        return self.get_response("metrics")[0]
+
+    @staticmethod
+    def _snapshot_time() -> Tuple[datetime, str]:
+        """Get the current time and its ISO string, for use across one result."""
+        now = datetime.now()
+        return now, now.isoformat()
+
+    def _compute_health_status(self) -> Dict[str, Any]:
         """Get basic health status."""
-        self.last_check = datetime.now()
+        now, now_iso = self._snapshot_time()
+        self.last_check = now
 
         # Basic health checks
         healthy = True
@@ -167,49 +343,28 @@ class HealthMonitor:
 
         return {
             "healthy": healthy,
-            "timestamp": (
-                self.last_check.isoformat()
-                if self.last_check
-                else datetime.now().isoformat()
-            ),
-            "uptime_seconds": (
-                (self.last_check - self.start_time).total_seconds()
-                if self.last_check
-                else 0.0
-            ),
+            "timestamp": now_iso,
+            "uptime_seconds": (now - self.start_time).total_seconds(),
             "checks": checks,
         }
 
-    def get_detailed_status(self) -> Dict[str, Any]:
+    def _compute_detailed_status(self) -> Dict[str, Any]:
         """Get detailed application status."""
+        now, _now_iso = self._snapshot_time()
         status = {
             "application": {
-                "name": self.config.get("app", {}).get(
-                    "name", "BBC News Bulletin Scraper"
-                ),
-                "version": self.config.get("app", {}).get("version", "1.0.0"),
-                "start_time": self.start_time.isoformat(),
-                "uptime_seconds": (datetime.now() - self.start_time).total_seconds(),
+                "name": self._app_name,
+                "version": self._app_version,
+                "start_time": self._start_time_iso,
+                "uptime_seconds": (now - self.start_time).total_seconds(),
             },
             "health": self.get_health_status(),
             "configuration": {
-                "programmes_enabled": len(
-                    [
-                        p
-                        for p in self.config.get("programmes", [])
-                        if p.get("enabled", True)
-                    ]
-                ),
-                "output_path": self.config.get("output", {}).get("base_path"),
-                "trim_start_seconds": self.config.get("audio", {}).get(
-                    "trim_start_seconds", 0
-                ),
-                "trim_end_seconds": self.config.get("audio", {}).get(
-                    "trim_end_seconds", 0
-                ),
-                "normalise_lufs": self.config.get("audio", {}).get(
-                    "normalise_lufs", None
-                ),
+                "programmes_enabled": self._programmes_enabled_count,
+                "output_path": self._configured_output_path,
+                "trim_start_seconds": self._trim_seconds[0],
+                "trim_end_seconds": self._trim_seconds[1],
+                "normalise_lufs": self._normalise_lufs,
             },
         }
 
@@ -219,10 +374,11 @@ class HealthMonitor:
 
         return status
 
-    def get_metrics(self) -> Dict[str, Any]:
+    def _compute_metrics(self) -> Dict[str, Any]:
         """Get application metrics."""
+        now, _now_iso = self._snapshot_time()
         metrics = {
-            "uptime_seconds": (datetime.now() - self.start_time).total_seconds(),
+            "uptime_seconds": (now - self.start_time).total_seconds(),
             "error_count_total": self.error_count,
             "warning_count_total": self.warning_count,
             "last_check_timestamp": (
@@ -253,36 +409,7 @@ class HealthMonitor:
     def _check_disk_space(self) -> Dict[str, Any]:
         """Check available disk space."""
         try:
-            import shutil
-
-            output_path = self.config.get("output", {}).get(
-                "base_path", _get_environment_default_path("output")
-            )
-            total, _used, free = shutil.disk_usage(output_path)
-
-            free_gb = free / (1024**3)
-            free_percent = (free / total) * 100
-
-            # Warn if less than 1GB or 10% free
-            if free_gb < 1 or free_percent < 10:
-                return {
-                    "name": "disk_space",
-                    "status": "fail",
-                    "message": f"Low disk space: {free_gb:.1f}GB ({free_percent:.1f}%) free",
-                }
-            elif free_gb < 5 or free_percent < 20:
-                return {
-                    "name": "disk_space",
-                    "status": "warn",
-                    "message": f"Disk space warning: {free_gb:.1f}GB ({free_percent:.1f}%) free",
-                }
-            else:
-                return {
-                    "name": "disk_space",
-                    "status": "pass",
-                    "message": f"Disk space OK: {free_gb:.1f}GB ({free_percent:.1f}%) free",
-                }
-
+            total, _used, free = self._disk_snapshot()
         except Exception as e:
             return {
                 "name": "disk_space",
@@ -290,39 +417,47 @@ class HealthMonitor:
                 "message": f"Failed to check disk space: {e}",
             }
 
+        free_gb = free / (1024**3)
+        free_percent = (free / total) * 100
+
+        # Fail if less than 1GB or 10% free, warn if less than 5GB or 20%
+        if free_gb < 1 or free_percent < 10:
+            status = "fail"
+        elif free_gb < 5 or free_percent < 20:
+            status = "warn"
+        else:
+            status = "pass"
+
+        # Keyed on the text reported, so small changes reuse the result
+        return dict(_disk_space_check(status, f"{free_gb:.1f}GB ({free_percent:.1f}%)"))
+
     def _check_recent_errors(self) -> Dict[str, Any]:
         """Check for recent errors in logs."""
-        # Simple implementation - could be enhanced to read log files
-        # recent_threshold = datetime.now() - timedelta(hours=1)  # noqa: F841
-
-        if self.error_count > 10:  # Arbitrary threshold
-            return {
-                "name": "recent_errors",
-                "status": "fail",
-                "message": (f"High error count: {self.error_count} errors"),
-            }
-        elif self.error_count > 5:
-            return {
-                "name": "recent_errors",
-                "status": "warn",
-                "message": (f"Moderate error count: {self.error_count} errors"),
-            }
+        return dict(_recent_errors_check(self.error_count))
+
+    def _disk_snapshot(self) -> Tuple[int, int, int]:
+        """Get (total, used, free) bytes for the output path, reused briefly."""
+        now = time.monotonic()
+        disk = self._disk
+        if disk and now - disk[0] < _DISK_TTL:
+            return disk[1]
+
+        if hasattr(os, "statvfs"):
+            st = os.statvfs(self._output_path)
+            total = st.f_blocks * st.f_frsize
+            used = (st.f_blocks - st.f_bfree) * st.f_frsize
+            usage = (total, used, st.f_bavail * st.f_frsize)
         else:
-            return {
-                "name": "recent_errors",
-                "status": "pass",
-                "message": f"Error count OK: {self.error_count} errors",
-            }
+            total, used, free = _disk_usage(self._output_path)
+            usage = (total, used, free)
+
+        self._disk = (now, usage)
+        return usage
 
     def _get_disk_usage(self) -> Dict[str, Any]:
         """Get disk usage information."""
         try:
-            import shutil
-
-            output_path = self.config.get("output", {}).get(
-                "base_path", _get_environment_default_path("output")
-            )
-            total, used, free = shutil.disk_usage(output_path)
+            total, used, free = self._disk_snapshot()
 
             return {
                 "disk_total_bytes": total,
@@ -336,13 +471,23 @@ class HealthMonitor:
 
     def record_error(self):
         """Record an error occurrence."""
-        self.error_count += 1
+        with self._counter_lock:
+            self.error_count += 1
 
     def record_warning(self):
         """Record a warning occurrence."""
-        self.warning_count += 1
+        with self._counter_lock:
+            self.warning_count += 1
 
     def reset_counters(self):
         """Reset error and warning counters."""
-        self.error_count = 0
-        self.warning_count = 0
+        with self._counter_lock:
+            self.error_count = 0
+            self.warning_count = 0
+        self.clear_cache()
+
+    def clear_cache(self):
+        """Discard cached results, so the next request recomputes them."""
+        with self._cache_lock:
+            self._cache.clear()
+        self._disk = None
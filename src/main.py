@@ -5,11 +5,14 @@ Application to automate pulling audio bulletins from BBC Sounds.
 """
 
 import logging
+import logging.handlers
 import os
+import queue
 import signal
 import sys
+import threading
 from pathlib import Path
-from typing import NoReturn, Optional
+from typing import List, NoReturn, Optional
 
 from config_manager import ConfigManager
 from health_monitor import HealthMonitor
@@ -27,6 +30,9 @@ class BBCBulletinScraper:
         self.scheduler: Optional[BulletinScheduler] = None
         self.health_monitor: Optional[HealthMonitor] = None
         self.running = False
+        self._stop_event = threading.Event()
+        self._log_listener: Optional[logging.handlers.QueueListener] = None
+        self._queue_handler: Optional[logging.handlers.QueueHandler] = None
 
         # Setup signal handlers for graceful shutdown
         signal.signal(signal.SIGINT, self._signal_handler)
@@ -92,11 +98,31 @@ class BBCBulletinScraper:
         # Ensure log directory exists
         Path(log_file).parent.mkdir(parents=True, exist_ok=True)
 
+        # Replace any listener (and its open log file) from a previous setup
+        self._stop_log_listener()
+
+        formatter = logging.Formatter(
+            "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+        )
+        output_handlers: List[logging.Handler] = [
+            logging.FileHandler(log_file),
+            logging.StreamHandler(sys.stdout),
+        ]
+        for handler in output_handlers:
+            handler.setFormatter(formatter)
+
+        # Threads only enqueue records; a background listener does the writes
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        queue_handler = logging.handlers.QueueHandler(log_queue)
+        queue_handler.setFormatter(logging.Formatter("%(message)s"))
+        self._queue_handler = queue_handler
+        self._log_listener = logging.handlers.QueueListener(log_queue, *output_handlers)
+        self._log_listener.start()
+
         # Configure logging
         logging.basicConfig(
             level=getattr(logging, log_level.upper()),
-            format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-            handlers=[logging.FileHandler(log_file), logging.StreamHandler(sys.stdout)],
+            handlers=[queue_handler],
             force=True,  # Force reconfiguration
         )
 
@@ -131,12 +157,12 @@ class BBCBulletinScraper:
             except Exception as e:
                 logging.warning("Failed to trigger startup download: %s", e)
 
-            # Keep the application running
+            # Keep the application running until shutdown() signals the event,
+            # waking each second as an untimed wait can't be interrupted by
+            # Ctrl+C on Windows
             logging.info("Entering main application loop...")
-            while self.running:
-                import time
-
-                time.sleep(1)
+            while not self._stop_event.wait(1):
+                pass
 
         except Exception as e:
             logging.error("Application error: %s", e)
@@ -145,6 +171,7 @@ class BBCBulletinScraper:
     def shutdown(self) -> None:
         """Shutdown the application gracefully."""
         self.running = False
+        self._stop_event.set()
 
         if self.scheduler is not None:
             self.scheduler.shutdown()
@@ -153,6 +180,23 @@ class BBCBulletinScraper:
             self.health_monitor.stop_http_server()
 
         logging.info("BBC Bulletin Scraper shutdown complete")
+        self._stop_log_listener()
+
+    def _stop_log_listener(self) -> None:
+        """Flush queued log records and log directly to the output handlers."""
+        if self._log_listener is None:
+            return
+
+        # Records from threads still finishing are written directly rather than
+        # queued for a stopped listener; swapping before stopping loses none
+        root = logging.getLogger()
+        for handler in self._log_listener.handlers:
+            root.addHandler(handler)
+        if self._queue_handler is not None:
+            root.removeHandler(self._queue_handler)
+        self._log_listener.stop()
+        self._log_listener = None
+        self._queue_handler = None
 
 
 def main() -> NoReturn:
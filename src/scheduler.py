@@ -5,14 +5,27 @@ Handles automatic scheduling of downloads at specified times.
 
 import logging
 from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
-import pytz
 from apscheduler.executors.pool import ThreadPoolExecutor
 from apscheduler.jobstores.memory import MemoryJobStore
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
 
 
+def _summarise_results(results: list) -> tuple[int, list, int]:
+    """Count successful programmes, collect failures and total files in one pass."""
+    successful = total_files = 0
+    failed = []
+    for result in results:
+        if result.get("success", False):
+            successful += 1
+            total_files += len(result.get("files") or ())
+        else:
+            failed.append(result)
+    return successful, failed, total_files
+
+
 class BulletinScheduler:
     """Manages scheduled downloading of BBC bulletins."""
 
@@ -23,11 +36,26 @@ class BulletinScheduler:
 
         # Setup timezone - use system local timezone if not specified
         timezone_str = self.scheduler_config.get("timezone")
+        self.timezone: ZoneInfo | None = None  # APScheduler uses system local
         if timezone_str:
-            self.timezone: pytz.BaseTzInfo | None = pytz.timezone(timezone_str)
-        else:
-            # Use system local timezone
-            self.timezone = None  # APScheduler will use system local timezone
+            try:
+                self.timezone = ZoneInfo(timezone_str)
+            except (ZoneInfoNotFoundError, ValueError):
+                logging.error(
+                    "Unknown timezone %r (is tzdata installed?), "
+                    "using system local timezone",
+                    timezone_str,
+                )
+
+        # Cron fields for the download job, built once from config
+        minutes_past_hour = self.scheduler_config.get("minutes_past_hour", [5])
+        start_hour = self.scheduler_config.get("start_hour", 0)
+        end_hour = self.scheduler_config.get("end_hour", 23)
+        days_of_week = self.scheduler_config.get("days_of_week", list(range(7)))
+        self._minute_expr = ",".join(map(str, sorted(set(minutes_past_hour))))
+        self._hour_expr = f"{start_hour}-{end_hour}"
+        # Convert day numbers (0=Monday) to cron format (0=Sunday)
+        self._cron_days_str = ",".join(str((day + 1) % 7) for day in days_of_week)
 
         # Initialize scheduler
         self.scheduler = self._create_scheduler()
@@ -117,35 +145,26 @@ class BulletinScheduler:
 
     def _schedule_download_jobs(self) -> None:
         """Schedule download jobs based on configuration."""
-        minutes_past_hour = self.scheduler_config.get("minutes_past_hour", [5])
-        start_hour = self.scheduler_config.get("start_hour", 0)
-        end_hour = self.scheduler_config.get("end_hour", 23)
-        days_of_week = self.scheduler_config.get("days_of_week", list(range(7)))
-
-        # Convert day numbers (0=Monday) to cron format (0=Sunday)
-        cron_days = [(day + 1) % 7 for day in days_of_week]
-        cron_days_str = ",".join(map(str, cron_days))
-
-        for minute in minutes_past_hour:
-            # Create cron trigger
-            trigger = CronTrigger(
-                minute=minute,
-                hour=f"{start_hour}-{end_hour}",
-                day_of_week=cron_days_str,
-                timezone=self.timezone,
-            )
+        # One job fires at every configured minute, rather than a job per minute
+        trigger = CronTrigger(
+            minute=self._minute_expr,
+            hour=self._hour_expr,
+            day_of_week=self._cron_days_str,
+            timezone=self.timezone,
+        )
 
-            # Add job
-            job_id = f"download_bulletins_{minute:02d}"
-            self.scheduler.add_job(
-                func=self._execute_download,
-                trigger=trigger,
-                id=job_id,
-                name=f"Download BBC Bulletins at :{minute:02d}",
-                replace_existing=True,
-            )
+        job_id = "download_bulletins"
+        self.scheduler.add_job(
+            func=self._execute_download,
+            trigger=trigger,
+            id=job_id,
+            name=f"Download BBC Bulletins at minutes {self._minute_expr}",
+            replace_existing=True,
+        )
 
-            logging.info("Scheduled download job: %s at minute %d", job_id, minute)
+        logging.info(
+            "Scheduled download job: %s at minutes %s", job_id, self._minute_expr
+        )
 
     def _schedule_cleanup_job(self) -> None:
         """Schedule daily cleanup job."""
@@ -174,21 +193,22 @@ class BulletinScheduler:
             results = self.scraper.download_programmes()
 
             # Process results
-            successful_programmes = [r for r in results if r.get("success", False)]
-            failed_programmes = [r for r in results if not r.get("success", False)]
-
-            total_files = sum(len(r.get("files", [])) for r in successful_programmes)
+            successful, failed_programmes, total_files = _summarise_results(results)
             logging.debug(
-                f"Download results: {len(successful_programmes)} successful, {len(failed_programmes)} failed, {total_files} files processed"
+                "Download results: %d successful, %d failed, %d files processed",
+                successful,
+                len(failed_programmes),
+                total_files,
             )
 
             # Log results
-            if successful_programmes:
+            if successful:
                 self.successful_runs += 1
                 logging.info(
-                    f"Download completed successfully: "
-                    f"{len(successful_programmes)} programmes, "
-                    f"{total_files} files processed"
+                    "Download completed successfully: "
+                    "%d programmes, %d files processed",
+                    successful,
+                    total_files,
                 )
             else:
                 self.failed_runs += 1
@@ -196,7 +216,7 @@ class BulletinScheduler:
 
             if failed_programmes:
                 logging.warning(
-                    f"{len(failed_programmes)} programmes failed to download"
+                    "%d programmes failed to download", len(failed_programmes)
                 )
                 for result in failed_programmes:
                     programme_name = result.get("programme", {}).get("name", "Unknown")
@@ -220,14 +240,17 @@ class BulletinScheduler:
         """Log information about scheduled jobs."""
         jobs = self.scheduler.get_jobs()
 
-        logging.info(f"Scheduled {len(jobs)} jobs:")
+        logging.info("Scheduled %d jobs:", len(jobs))
         for job in jobs:
             next_run = job.next_run_time
             if next_run:
-                next_run_str = next_run.strftime("%Y-%m-%d %H:%M:%S")
-                logging.info(f"  {job.name} - Next run: {next_run_str}")
+                logging.info(
+                    "  %s - Next run: %s",
+                    job.name,
+                    next_run.strftime("%Y-%m-%d %H:%M:%S"),
+                )
             else:
-                logging.info(f"  {job.name} - No next run scheduled")
+                logging.info("  %s - No next run scheduled", job.name)
 
     def shutdown(self) -> None:
         """Shutdown the scheduler gracefully."""
@@ -268,18 +291,16 @@ class BulletinScheduler:
             logging.info("Manual download triggered")
             results = self.scraper.download_programmes()
 
-            successful_programmes = [r for r in results if r.get("success", False)]
-            failed_programmes = [r for r in results if not r.get("success", False)]
-            total_files = sum(len(r.get("files", [])) for r in successful_programmes)
+            successful, failed_programmes, total_files = _summarise_results(results)
 
             return {
                 "success": True,
-                "programmes_successful": len(successful_programmes),
+                "programmes_successful": successful,
                 "programmes_failed": len(failed_programmes),
                 "total_files": total_files,
                 "results": results,
             }
 
         except Exception as e:
-            logging.error(f"Manual download failed: {e}")
+            logging.error("Manual download failed: %s", e)
             return {"success": False, "error": str(e)}
@@ -3,17 +3,85 @@ Scraper Module for BBC News Bulletin Scraper
 Handles downloading BBC programmes using get_iplayer and processing them.
 """
 
+import asyncio
+import hashlib
+import json
 import logging
+import os
+import re
+import shutil
 import subprocess
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
 from datetime import datetime
+from functools import cached_property, lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from audio_processor import AudioProcessor
 
+# Programme PIDs start with a letter, followed by letters and digits
+_PID_URL_RE = re.compile(r"/programmes/([a-z][a-z0-9]+)")
+_PID_BARE_RE = re.compile(r"^[a-z][a-z0-9]+$")
 
+# An episode PID in a downloaded file's name (get_iplayer includes it by default)
+_PID_IN_NAME_RE = re.compile(r"(?<![a-z0-9])([a-z][0-9][a-z0-9]{6})(?![a-z0-9])")
+
+# Runs of characters not safe in a programme's directory name
+_UNSAFE_NAME_RE = re.compile(r"[^a-z0-9]+")
+
+# Lines of get_iplayer output kept for results and error messages
+_OUTPUT_TAIL_LINES = 64
+
+# get_iplayer redraws its progress with carriage returns rather than newlines,
+# so its output is read in chunks and split on either
+_OUTPUT_CHUNK_SIZE = 64 * 1024
+_LINE_BREAK_RE = re.compile(rb"[\r\n]+")
+
+# Processed downloads remembered in the manifest (oldest are dropped first)
+_MANIFEST_MAX_ENTRIES = 256
+
+
+def _programme_keywords(programme_name: str) -> frozenset:
+    """Get the words identifying a programme in downloaded filenames."""
+    # Skip common BBC words, and short words like "on", "of"
+    words = programme_name.lower().replace("bbc", "").replace("update", "").split()
+    return frozenset(word for word in words if len(word) > 2)
+
+
+def _programme_slug(programme: Dict[str, Any]) -> str:
+    """Get a filesystem-safe directory name, unique to a programme's settings."""
+    name = programme.get("output_name") or programme.get("name") or "unknown"
+    readable = _UNSAFE_NAME_RE.sub("_", str(name).lower()).strip("_") or "unknown"
+    # Different names can read the same once made safe, so add a short digest
+    identity = f"{name}\0{programme.get('url', '')}".encode()
+    return f"{readable}_{hashlib.blake2b(identity, digest_size=4).hexdigest()}"
+
+
+def _file_digest(path: Path) -> str:
+    """Get the SHA-256 hex digest of a file's contents."""
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+# Directories already created by this process
+_MKDIR_CACHE: set[str] = set()
+
+
+def _ensure_dir(path: Path) -> None:
+    """Create a directory (and parents) unless this process already has."""
+    key = str(path)
+    if key not in _MKDIR_CACHE:
+        path.mkdir(parents=True, exist_ok=True)
+        _MKDIR_CACHE.add(key)
+
+
+@lru_cache(maxsize=8)
 def _get_environment_default_path(path_type: str) -> str:
-    """Get environment-appropriate default paths."""
+    """Get environment-appropriate default paths (detected once per process)."""
     # Check if we're likely running in Docker
     if Path("/app").exists():
         return f"/app/{path_type}"
@@ -27,18 +95,71 @@ def _get_environment_default_path(path_type: str) -> str:
     return str(Path.cwd() / path_type)
 
 
+@lru_cache(maxsize=1)
+def _verified_get_iplayer() -> str:
+    """Find get_iplayer on PATH, once per process.
+
+    Running it is skipped unless BBC_SCRAPER_VERIFY=1 is set. Failures are
+    not cached, so a later check will look again.
+    """
+    path = shutil.which("get_iplayer")
+    if path is None:
+        error_msg = (
+            "get_iplayer not found. Please install it:\n"
+            "macOS: brew install get_iplayer\n"
+            "Ubuntu/Debian: apt-get install get-iplayer\n"
+            "Or see: https://github.com/get-iplayer/get_iplayer/wiki"
+        )
+        logging.error(error_msg)
+        raise RuntimeError(error_msg)
+
+    if os.environ.get("BBC_SCRAPER_VERIFY") == "1":
+        try:
+            # Run get_iplayer --help to check it actually works
+            result = subprocess.run(
+                [path, "--help"], capture_output=True, text=True, timeout=10
+            )
+            if result.returncode != 0:
+                raise RuntimeError("get_iplayer command failed")
+        except subprocess.TimeoutExpired as exc:
+            error_msg = "get_iplayer verification timed out"
+            logging.error(error_msg)
+            raise RuntimeError(error_msg) from exc
+        except Exception as exc:
+            error_msg = f"get_iplayer verification failed: {exc}"
+            logging.error(error_msg)
+            raise RuntimeError(error_msg) from exc
+        logging.info("get_iplayer verification successful")
+    else:
+        logging.info("get_iplayer found at %s", path)
+
+    return path
+
+
 class BBCScraper:
     """Main scraper for BBC programmes using get_iplayer."""
 
+    # get_iplayer options that are the same for every programme
+    _STATIC_TAIL = (
+        # Specify radio type for BBC radio programmes
+        "--type",
+        "radio",
+        # Force download
+        "--get",
+        # Add verbose output for debugging
+        "--verbose",
+        # Overwrite existing files to avoid failures
+        "--overwrite",
+        # Force download even if already in history
+        "--force",
+    )
+
     def __init__(self, config: dict):
         self.config = config
         self.download_config = config.get("download", {})
         self.output_config = config.get("output", {})
         self.get_iplayer_config = config.get("get_iplayer", {})
 
-        # Initialize audio processor
-        self.audio_processor = AudioProcessor(config)
-
         # Setup directories with environment-aware defaults
         self.temp_dir = Path(
             self.download_config.get(
@@ -54,58 +175,77 @@ class BBCScraper:
             )
         )
 
+        # Settings read for every programme, looked up once
+        audio_config = config.get("audio", {})
+        self._since_hours = str(self.get_iplayer_config.get("since_hours", 24))
+        self._available_since_hours = str(
+            self.get_iplayer_config.get("available_since_hours", 12)
+        )
+        self._radio_quality = self._map_audio_quality(
+            audio_config.get("quality", "high")
+        )
+        self._extra_options = list(self.get_iplayer_config.get("extra_options", []))
+        self._timeout_seconds = self.download_config.get("timeout_seconds", 600)
+        self._max_concurrent = max(1, self.download_config.get("max_concurrent", 2))
+        self._audio_format = audio_config.get("format", "mp3")
+        # Profile directory passed to every get_iplayer run
+        self._cache_str = str(self.cache_dir)
+
+        # Results for downloads already processed, keyed by episode PID and size
+        self._manifest_path = self.cache_dir / "processed.json"
+        self._manifest: Optional[Dict[str, Dict[str, Any]]] = None
+        self._manifest_lock = threading.Lock()
+
         # Create directories
-        self.temp_dir.mkdir(parents=True, exist_ok=True)
-        self.output_dir.mkdir(parents=True, exist_ok=True)
-        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        for directory in (self.temp_dir, self.output_dir, self.cache_dir):
+            _ensure_dir(directory)
 
         # Verify get_iplayer is available
         self._verify_get_iplayer()
 
+    @cached_property
+    def audio_processor(self) -> AudioProcessor:
+        """Audio processor, created when first needed."""
+        return AudioProcessor(self.config)
+
     def _verify_get_iplayer(self) -> None:
         """Verify that get_iplayer is installed and accessible."""
-        try:
-            # Try to run get_iplayer --help to check if it's available
-            result = subprocess.run(
-                ["get_iplayer", "--help"], capture_output=True, text=True, timeout=10
-            )
-            if result.returncode != 0:
-                raise RuntimeError("get_iplayer command failed")
+        _verified_get_iplayer()
 
-            logging.info("get_iplayer verification successful")
+    def _download_dir(self, programme: Dict[str, Any]) -> Path:
+        """Get a programme's own download directory.
 
-        except subprocess.TimeoutExpired as exc:
-            error_msg = "get_iplayer verification timed out"
-            logging.error(error_msg)
-            raise RuntimeError(error_msg) from exc
-        except FileNotFoundError as exc:
-            error_msg = (
-                "get_iplayer not found. Please install it:\n"
-                "macOS: brew install get_iplayer\n"
-                "Ubuntu/Debian: apt-get install get-iplayer\n"
-                "Or see: https://github.com/get-iplayer/get_iplayer/wiki"
-            )
-            logging.error(error_msg)
-            raise RuntimeError(error_msg) from exc
-        except Exception as exc:
-            error_msg = f"get_iplayer verification failed: {exc}"
-            logging.error(error_msg)
-            raise RuntimeError(error_msg) from exc
+        Programmes download concurrently, so in a shared directory a programme
+        could pick up another's download.
+        """
+        download_dir = self.temp_dir / _programme_slug(programme)
+        _ensure_dir(download_dir)
+        return download_dir
 
     def download_programmes(self) -> List[Dict[str, Any]]:
         """Download all enabled programmes."""
         programmes = self.config.get("programmes", [])
         enabled_programmes = [p for p in programmes if p.get("enabled", True)]
         logging.info(
-            f"Found {len(programmes)} programmes, {len(enabled_programmes)} enabled"
+            "Found %d programmes, %d enabled", len(programmes), len(enabled_programmes)
         )
 
-        results = []
+        if not enabled_programmes:
+            return []
+
+        # Downloads are I/O bound subprocesses, so overlap them with threads
+        max_workers = min(len(enabled_programmes), self._max_concurrent)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(self.download_programme, programme)
+                for programme in enabled_programmes
+            ]
 
-        for programme in enabled_programmes:
+        # Results are returned in programme order
+        results = []
+        for programme, future in zip(enabled_programmes, futures):
             try:
-                result = self.download_programme(programme)
-                results.append(result)
+                results.append(future.result())
             except Exception as e:
                 logging.error(
                     "Failed to download programme %s: %s", programme.get("name"), e
@@ -132,59 +272,86 @@ class BBCScraper:
         logging.debug("get_iplayer command: %s", " ".join(cmd))
 
         try:
+            returncode, output = self._run_get_iplayer(cmd)
+            return self._handle_download_result(programme, returncode, output)
 
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                cwd=str(self.temp_dir),
-                timeout=self.download_config.get("timeout_seconds", 600),
-                check=False,
-            )
+        except subprocess.TimeoutExpired:
+            error_msg = f"Download timeout for {programme_name}"
+            logging.error(error_msg)
+            return {
+                "programme": programme,
+                "success": False,
+                "error": error_msg,
+                "files": [],
+            }
+        except Exception as e:
+            logging.error("Download error for %s: %s", programme_name, e)
+            return {
+                "programme": programme,
+                "success": False,
+                "error": str(e),
+                "files": [],
+            }
 
-            logging.debug(f"get_iplayer return code: {result.returncode}")
-            if result.returncode != 0:
-                logging.debug(f"get_iplayer stderr: {result.stderr[:200]}")
-
-            # Handle result - get_iplayer returns 1 if some episodes fail, but others may succeed
-            if result.returncode == 0:
-                logging.info("Download completed for: %s", programme_name)
-            elif result.returncode == 1:
-                logging.warning(
-                    f"get_iplayer partial success for {programme_name} (some episodes may have failed)"
-                )
-            else:
+    async def download_programmes_async(self) -> List[Dict[str, Any]]:
+        """Download all enabled programmes concurrently on the event loop."""
+        programmes = self.config.get("programmes", [])
+        enabled_programmes = [p for p in programmes if p.get("enabled", True)]
+        logging.info(
+            "Found %d programmes, %d enabled", len(programmes), len(enabled_programmes)
+        )
+
+        limit = asyncio.Semaphore(self._max_concurrent)
+
+        async def download(programme: Dict[str, Any]) -> Dict[str, Any]:
+            async with limit:
+                return await self.download_programme_async(programme)
+
+        outcomes = await asyncio.gather(
+            *(download(programme) for programme in enabled_programmes),
+            return_exceptions=True,
+        )
+
+        # Results are returned in programme order
+        results = []
+        for programme, outcome in zip(enabled_programmes, outcomes):
+            if isinstance(outcome, BaseException):
                 logging.error(
-                    f"get_iplayer failed completely for {programme_name}: {result.stderr}"
+                    "Failed to download programme %s: %s",
+                    programme.get("name"),
+                    outcome,
                 )
-                return {
+                outcome = {
                     "programme": programme,
                     "success": False,
-                    "error": result.stderr,
+                    "error": str(outcome),
                     "files": [],
                 }
+            results.append(outcome)
 
-            # Find downloaded files (works for both success and partial success)
-            downloaded_files = self._find_downloaded_files(programme_name)
-            logging.debug(
-                f"Found {len(downloaded_files)} downloaded files for {programme_name}"
-            )
+        return results
 
-            # Process downloaded files
-            processed_files = []
-            for file_path in downloaded_files:
-                processed_file = self._process_downloaded_file(file_path, programme)
-                if processed_file:
-                    processed_files.append(processed_file)
+    async def download_programme_async(
+        self, programme: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Download a specific programme without blocking the event loop."""
+        programme_name = programme.get("name", "Unknown")
 
-            return {
-                "programme": programme,
-                "success": True,
-                "files": processed_files,
-                "raw_output": result.stdout,
-            }
+        logging.info("Starting download for programme: %s", programme_name)
 
-        except subprocess.TimeoutExpired:
+        # Build get_iplayer command
+        cmd = self._build_get_iplayer_command(programme)
+        logging.debug("get_iplayer command: %s", " ".join(cmd))
+
+        try:
+            returncode, output = await self._run_get_iplayer_async(cmd)
+
+            # Finding and processing files touches the disk and runs ffmpeg
+            return await asyncio.to_thread(
+                self._handle_download_result, programme, returncode, output
+            )
+
+        except asyncio.TimeoutError:
             error_msg = f"Download timeout for {programme_name}"
             logging.error(error_msg)
             return {
@@ -194,7 +361,6 @@ class BBCScraper:
                 "files": [],
             }
         except Exception as e:
-            programme_name = programme.get("name", "Unknown")
             logging.error("Download error for %s: %s", programme_name, e)
             return {
                 "programme": programme,
@@ -203,20 +369,154 @@ class BBCScraper:
                 "files": [],
             }
 
+    def _handle_download_result(
+        self, programme: Dict[str, Any], returncode: int, output: str
+    ) -> Dict[str, Any]:
+        """Check a get_iplayer run's result and process any downloaded files."""
+        programme_name = programme.get("name", "Unknown")
+
+        logging.debug("get_iplayer return code: %d", returncode)
+        if returncode != 0:
+            logging.debug("get_iplayer output: %s", output[-200:])
+
+        # Handle result - get_iplayer returns 1 if some episodes fail, but others may succeed
+        if returncode == 0:
+            logging.info("Download completed for: %s", programme_name)
+        elif returncode == 1:
+            logging.warning(
+                "get_iplayer partial success for %s (some episodes may have failed)",
+                programme_name,
+            )
+        else:
+            logging.error(
+                "get_iplayer failed completely for %s: %s", programme_name, output
+            )
+            return {
+                "programme": programme,
+                "success": False,
+                "error": output,
+                "files": [],
+            }
+
+        # Find downloaded files (works for both success and partial success)
+        download_dir = self._download_dir(programme)
+        downloaded_files = self._find_downloaded_files(
+            programme_name, _programme_keywords(programme_name), download_dir
+        )
+        logging.debug(
+            "Found %d downloaded files for %s", len(downloaded_files), programme_name
+        )
+
+        # Process downloaded files
+        processed_files = []
+        for file_path in downloaded_files:
+            processed_file = self._process_downloaded_file(file_path, programme)
+            if processed_file:
+                processed_files.append(processed_file)
+
+        return {
+            "programme": programme,
+            "success": True,
+            "files": processed_files,
+            "raw_output": output,
+        }
+
+    def _run_get_iplayer(self, cmd: List[str]) -> Tuple[int, str]:
+        """Run get_iplayer, logging its output as it arrives.
+
+        Only the last lines of output are kept. Raises
+        subprocess.TimeoutExpired if it runs past the configured timeout.
+        """
+        timeout = self._timeout_seconds
+        tail: deque = deque(maxlen=_OUTPUT_TAIL_LINES)
+        timed_out = threading.Event()
+
+        with subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            errors="replace",
+            bufsize=1,
+        ) as proc:
+
+            def kill() -> None:
+                timed_out.set()
+                proc.kill()
+
+            # Reading blocks until output ends, so a timer enforces the timeout
+            timer = threading.Timer(timeout, kill)
+            timer.start()
+            try:
+                assert proc.stdout is not None
+                for line in proc.stdout:
+                    line = line.rstrip("\n")
+                    logging.debug("get_iplayer: %s", line)
+                    tail.append(line)
+                returncode = proc.wait()
+            finally:
+                timer.cancel()
+
+        if timed_out.is_set():
+            raise subprocess.TimeoutExpired(cmd, timeout, output="\n".join(tail))
+
+        return returncode, "\n".join(tail)
+
+    async def _run_get_iplayer_async(self, cmd: List[str]) -> Tuple[int, str]:
+        """Run get_iplayer on the event loop, logging its output as it arrives.
+
+        Raises asyncio.TimeoutError if it runs past the configured timeout.
+        """
+        timeout = self._timeout_seconds
+        tail: deque = deque(maxlen=_OUTPUT_TAIL_LINES)
+
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+        )
+
+        def record(raw_line: bytes) -> None:
+            line = raw_line.decode(errors="replace")
+            logging.debug("get_iplayer: %s", line)
+            tail.append(line)
+
+        async def read_output() -> int:
+            assert proc.stdout is not None
+            # Not line by line, as a long progress run would pass the reader's
+            # line length limit
+            pending = b""
+            while chunk := await proc.stdout.read(_OUTPUT_CHUNK_SIZE):
+                *lines, pending = _LINE_BREAK_RE.split(pending + chunk)
+                for raw_line in lines:
+                    if raw_line:
+                        record(raw_line)
+            if pending:
+                record(pending)
+            return await proc.wait()
+
+        try:
+            returncode = await asyncio.wait_for(read_output(), timeout)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            raise
+
+        return returncode, "\n".join(tail)
+
     def _build_get_iplayer_command(self, programme: Dict[str, Any]) -> List[str]:
         """Build get_iplayer command for a programme."""
-        cmd = ["get_iplayer"]
-
         # Extract PID from URL or use URL directly
         programme_url = programme.get("url", "")
         pid = self._extract_pid_from_url(programme_url)
 
         if pid:
             # Use PID format (preferred)
-            cmd.extend(["--pid", pid])
+            source_args = ["--pid", pid]
         elif programme_url:
             # Use URL format as fallback
-            cmd.extend(["--url", programme_url])
+            source_args = ["--url", programme_url]
         else:
             raise ValueError(
                 f"No valid URL or PID found for programme: {programme.get('name', 'Unknown')}"
@@ -224,48 +524,31 @@ class BBCScraper:
 
         # Get latest episodes only - use recursive to find episodes but limit to recent ones
         if programme.get("pid_recursive", False):
-            cmd.append("--pid-recursive")
             # Limit to episodes from the configured hours to get only latest bulletins
-            since_hours = self.config.get("get_iplayer", {}).get("since_hours", 24)
-            cmd.extend(["--since", str(since_hours)])
-
-        # Output directory
-        cmd.extend(["--output", str(self.temp_dir)])
-
-        # Audio quality
-        audio_quality = self.config.get("audio", {}).get("quality", "high")
-        cmd.extend(["--radio-quality", self._map_audio_quality(audio_quality)])
-
-        # Cache directory (profile-dir)
-        cmd.extend(["--profile-dir", str(self.cache_dir)])
-
-        # Specify radio type for BBC radio programmes
-        cmd.extend(["--type", "radio"])
-
-        # Limit to content available since configured hours (latest bulletins only)
-        available_since_hours = self.config.get("get_iplayer", {}).get(
-            "available_since_hours", 12
-        )
-        cmd.extend(["--available-since", str(available_since_hours)])
-
-        # Force download
-        cmd.append("--get")
-
-        # Add verbose output for debugging
-        cmd.append("--verbose")
-
-        # Overwrite existing files to avoid failures
-        cmd.append("--overwrite")
-
-        # Force download even if already in history
-        cmd.append("--force")
-
-        # Additional options from config
-        extra_options = self.get_iplayer_config.get("extra_options", [])
-        if extra_options:
-            cmd.extend(extra_options)
-
-        return cmd
+            recursive_args = ["--pid-recursive", "--since", self._since_hours]
+        else:
+            recursive_args = []
+
+        download_dir = self._download_dir(programme)
+
+        return [
+            "get_iplayer",
+            *source_args,
+            *recursive_args,
+            "--output",
+            str(download_dir),
+            "--radio-quality",
+            self._radio_quality,
+            # Cache directory (profile-dir)
+            "--profile-dir",
+            self._cache_str,
+            # Limit to content available since configured hours (latest bulletins only)
+            "--available-since",
+            self._available_since_hours,
+            *self._STATIC_TAIL,
+            # Additional options from config
+            *self._extra_options,
+        ]
 
     def _extract_pid_from_url(self, url: str) -> Optional[str]:
         """Extract PID from BBC programme URL."""
@@ -275,15 +558,12 @@ class BBCScraper:
         # Extract PID from URLs like:
         # https://www.bbc.co.uk/programmes/p08dy4zh
         # https://www.bbc.co.uk/programmes/p08m00gv
-        import re
-
-        # Match PID pattern (starts with letter, followed by alphanumeric)
-        pid_match = re.search(r"/programmes/([a-z][a-z0-9]+)", url)
+        pid_match = _PID_URL_RE.search(url)
         if pid_match:
             return pid_match.group(1)
 
         # If it's already just a PID
-        if re.match(r"^[a-z][a-z0-9]+$", url):
+        if _PID_BARE_RE.match(url):
             return url
 
         return None
@@ -293,68 +573,69 @@ class BBCScraper:
         quality_map = {"high": "high", "std": "std", "med": "med", "low": "low"}
         return quality_map.get(quality, "std")
 
-    def _find_downloaded_files(self, programme_name: str) -> List[Path]:
+    def _find_downloaded_files(
+        self,
+        programme_name: str,
+        keywords: Optional[frozenset] = None,
+        directory: Optional[Path] = None,
+    ) -> List[Path]:
         """Find the latest downloaded file for a specific programme."""
-        audio_extensions = [".mp3", ".m4a", ".wav", ".aac"]
-        programme_files = []
+        if keywords is None:
+            keywords = _programme_keywords(programme_name)
+        if directory is None:
+            directory = self.temp_dir
+        audio_extensions = (".mp3", ".m4a", ".wav", ".aac")
+        # Only consider files modified within the last hour
+        cutoff = time.time() - 3600
+        # Newest matching file so far, as (mtime, path)
+        latest: Optional[Tuple[float, str]] = None
+
+        # One pass over the temp directory, with one stat per candidate
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                filename_lower = entry.name.lower()
+                if not filename_lower.endswith(audio_extensions):
+                    continue
 
-        # Search in temp directory for recent audio files
-        for ext in audio_extensions:
-            pattern = f"*{ext}"
-            for file_path in self.temp_dir.glob(pattern):
                 # Skip partial/incomplete files
-                if ".partial." in file_path.name or ".hls." in file_path.name:
+                if ".partial." in entry.name or ".hls." in entry.name:
                     continue
 
-                # Check if file was created recently (within last hour)
-                if self._is_recent_file(file_path):
-                    # Check if filename relates to this programme
-                    filename_lower = file_path.name.lower()
-
-                    # Match by extracting key words from programme name
-                    if self._is_programme_match(filename_lower, programme_name):
-                        programme_files.append(file_path)
+                try:
+                    if not entry.is_file():
+                        continue
+                    mtime = entry.stat().st_mtime
+                except OSError:
+                    continue
 
-        # Sort by modification time (newest first) and return only the latest
-        if programme_files:
-            programme_files.sort(key=lambda f: f.stat().st_mtime, reverse=True)
-            latest_file = [programme_files[0]]  # Return only the most recent
+                # Match by extracting key words from programme name
+                if (
+                    mtime > cutoff
+                    and (latest is None or mtime > latest[0])
+                    and self._is_programme_match(filename_lower, keywords)
+                ):
+                    latest = (mtime, entry.path)
+
+        # Return only the most recent
+        if latest is not None:
+            latest_file = [Path(latest[1])]
             logging.info(
-                f"Found latest file for {programme_name}: {latest_file[0].name}"
+                "Found latest file for %s: %s", programme_name, latest_file[0].name
             )
             return latest_file
         else:
-            logging.info(f"No recent files found for {programme_name}")
+            logging.info("No recent files found for %s", programme_name)
             return []
 
-    def _is_programme_match(self, filename_lower: str, programme_name: str) -> bool:
-        """Check if filename matches programme name by extracting key identifying words."""
-        programme_lower = programme_name.lower()
-
-        # Extract key words from programme name (skip common BBC words)
-        programme_words = (
-            programme_lower.replace("bbc", "").replace("update", "").strip().split()
-        )
-
-        # Check if any significant programme word appears in filename
-        for word in programme_words:
-            if (
-                word and len(word) > 2 and word in filename_lower
-            ):  # Skip short words like "on", "of"
-                return True
-
-        return False
+    def _is_programme_match(self, filename_lower: str, keywords: frozenset) -> bool:
+        """Check if filename contains any of a programme's key identifying words."""
+        return any(word in filename_lower for word in keywords)
 
     def _is_recent_file(self, file_path: Path, max_age_hours: int = 1) -> bool:
         """Check if file was created recently."""
         try:
-            from datetime import timedelta
-
-            file_time = datetime.fromtimestamp(file_path.stat().st_mtime)
-            now = datetime.now()
-
-            return (now - file_time) < timedelta(hours=max_age_hours)
-        except Exception:
+            return time.time() - file_path.stat().st_mtime < max_age_hours * 3600
+        except OSError:
             return False
 
     def _process_downloaded_file(
@@ -365,27 +646,55 @@ class BBCScraper:
             # Generate output filename
             output_file = self._generate_output_filename(programme)
 
+            # Skip the transcode if this exact download was processed before.
+            # Re-downloads get new mtimes, so look up by episode PID and size
+            pid_match = _PID_IN_NAME_RE.search(input_file.name.lower())
+            episode = pid_match.group(1) if pid_match else input_file.name
+            manifest_key = f"{episode}:{os.stat(input_file).st_size}"
+            previous = self._get_processed(manifest_key)
+            if (
+                previous
+                and previous.get("output_file") == str(output_file)
+                and output_file.exists()
+            ):
+                # Only a likely repeat is worth reading in full to compare
+                if previous.pop("sha256", None) == _file_digest(input_file):
+                    logging.info("Already processed %s, skipping", input_file)
+                    self._cleanup_temp_file(input_file)
+                    return previous
+
             # Ensure output directory exists
             output_file.parent.mkdir(parents=True, exist_ok=True)
 
-            # Process audio (trim, convert, normalise)
-            if self.audio_processor.process_audio(input_file, output_file, programme):
+            # Process audio (trim, convert, normalise), which also reports the duration
+            success, duration = self.audio_processor.process_audio_with_duration(
+                input_file, output_file, programme
+            )
+            if success:
+                # Hashed for the manifest just after ffmpeg read it, so it's cached
+                digest = _file_digest(input_file)
+
                 # Clean up temp file
                 self._cleanup_temp_file(input_file)
 
-                # Get file info
-                duration = self.audio_processor.get_duration(output_file)
-                file_size = output_file.stat().st_size
+                # Get file info (probed only if the output already existed)
+                if duration is None:
+                    duration = self.audio_processor.get_duration(output_file)
+                output_st = os.stat(output_file)
 
-                logging.info(f"Processed file saved: {output_file}")
+                logging.info("Processed file saved: %s", output_file)
 
-                return {
+                processed = {
                     "input_file": str(input_file),
                     "output_file": str(output_file),
                     "duration_seconds": duration,
-                    "file_size_bytes": file_size,
-                    "processed_at": datetime.now().isoformat(),
+                    "file_size_bytes": output_st.st_size,
+                    "processed_at": datetime.fromtimestamp(
+                        output_st.st_mtime
+                    ).isoformat(),
                 }
+                self._record_processed(manifest_key, {**processed, "sha256": digest})
+                return processed
             else:
                 logging.error("Failed to process audio file: %s", input_file)
                 return None
@@ -394,6 +703,40 @@ class BBCScraper:
             logging.error("Error processing file %s: %s", input_file, e)
             return None
 
+    def _load_manifest(self) -> Dict[str, Dict[str, Any]]:
+        """Get the processed downloads manifest, reading it on first use."""
+        manifest = self._manifest
+        if manifest is None:
+            try:
+                manifest = json.loads(self._manifest_path.read_bytes())
+            except (OSError, ValueError):
+                manifest = None
+            if not isinstance(manifest, dict):
+                manifest = {}
+            self._manifest = manifest
+        return manifest
+
+    def _get_processed(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get the recorded result for a processed download, if any."""
+        with self._manifest_lock:
+            previous = self._load_manifest().get(key)
+        return dict(previous) if previous else None
+
+    def _record_processed(self, key: str, processed: Dict[str, Any]) -> None:
+        """Record a processed download, writing the manifest atomically."""
+        with self._manifest_lock:
+            manifest = self._load_manifest()
+            manifest[key] = processed
+            while len(manifest) > _MANIFEST_MAX_ENTRIES:
+                del manifest[next(iter(manifest))]
+
+            temp_path = self._manifest_path.with_suffix(".json.tmp")
+            try:
+                temp_path.write_text(json.dumps(manifest))
+                os.replace(temp_path, self._manifest_path)
+            except OSError as e:
+                logging.warning("Failed to save processed manifest: %s", e)
+
     def _generate_output_filename(self, programme: Dict[str, Any]) -> Path:
         """Generate simple output filename using output_name from programme config."""
         # Get output name from programme config
@@ -402,11 +745,8 @@ class BBCScraper:
             # Fallback to programme name if output_name not specified
             output_name = programme.get("name", "unknown").replace(" ", "_").lower()
 
-        # Get audio format for extension
-        audio_format = self.config.get("audio", {}).get("format", "mp3")
-
         # Simple filename: {output_name}.{extension}
-        filename = f"{output_name}.{audio_format}"
+        filename = f"{output_name}.{self._audio_format}"
         output_path = self.output_dir / filename
 
         return output_path
@@ -414,10 +754,11 @@ class BBCScraper:
     def _cleanup_temp_file(self, file_path: Path) -> None:
         """Remove temporary file."""
         try:
-            file_path.unlink()
-            logging.debug(f"Cleaned up temp file: {file_path}")
-        except Exception as e:
-            logging.warning(f"Failed to cleanup temp file {file_path}: {e}")
+            with suppress(FileNotFoundError):
+                os.unlink(file_path)
+            logging.debug("Cleaned up temp file: %s", file_path)
+        except OSError as e:
+            logging.warning("Failed to cleanup temp file %s: %s", file_path, e)
 
     def cleanup_old_files(self) -> None:
         """No longer needed - we keep latest bulletins only, no retention policy."""
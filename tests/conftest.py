@@ -0,0 +1,91 @@
+"""Shared pytest configuration for the BBC News Bulletin Scraper tests."""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+# Add src to path for testing, once for the whole session
+_SRC_DIR = str(Path(__file__).resolve().parent.parent / "src")
+if _SRC_DIR not in sys.path:
+    sys.path.insert(0, _SRC_DIR)
+
+
+@pytest.fixture(scope="module")
+def wav_processor():
+    """An AudioProcessor with the default WAV test configuration, shared per module."""
+    from audio_processor import AudioProcessor
+
+    return AudioProcessor({"audio": {"format": "wav"}})
+
+
+@pytest.fixture(scope="session")
+def config_manager():
+    """A ConfigManager using the default config search, shared per session."""
+    from config_manager import ConfigManager
+
+    return ConfigManager()
+
+
+@pytest.fixture(scope="session")
+def scraper_stub():
+    """A stand-in scraper providing only what BulletinScheduler calls."""
+    return SimpleNamespace(download_programmes=lambda: [])
+
+
+@pytest.fixture(scope="session")
+def scheduler(scraper_stub):
+    """A BulletinScheduler that is never started, shared per session."""
+    from scheduler import BulletinScheduler
+
+    return BulletinScheduler({"scheduler": {"minutes_past_hour": [5]}}, scraper_stub)
+
+
+@pytest.fixture(scope="session")
+def health_monitor():
+    """A HealthMonitor with its HTTP server disabled, shared per session."""
+    from health_monitor import HealthMonitor
+
+    # Never bind a socket, even if the server ends up enabled by default
+    with patch("health_monitor.ThreadingHTTPServer") as mock_server:
+        monitor = HealthMonitor({"health": {"enabled": False}})
+    mock_server.assert_not_called()
+    return monitor
+
+
+@pytest.fixture(scope="session")
+def audio_processor_factory():
+    """Build AudioProcessors from audio settings, reusing one per distinct config."""
+    from audio_processor import AudioProcessor
+
+    processors = {}
+
+    def build(**audio_config):
+        key = tuple(sorted(audio_config.items()))
+        if key not in processors:
+            processors[key] = AudioProcessor({"audio": audio_config})
+        return processors[key]
+
+    return build
+
+
+@pytest.fixture(autouse=True)
+def _no_subprocess(monkeypatch):
+    """Replace subprocess.run for every test, so ffmpeg and friends never run."""
+    mock_run = MagicMock(
+        return_value=SimpleNamespace(returncode=0, stdout=b"", stderr=b"")
+    )
+    monkeypatch.setattr("subprocess.run", mock_run)
+    return mock_run
+
+
+@pytest.fixture
+def patched_subprocess(monkeypatch, _no_subprocess):
+    """Stub out ffmpeg, the output lock and the final move, returning the run mock."""
+    monkeypatch.setattr("os.open", MagicMock(return_value=123))
+    monkeypatch.setattr("os.close", MagicMock())
+    monkeypatch.setattr("fcntl.flock", MagicMock())
+    monkeypatch.setattr("pathlib.Path.replace", MagicMock())
+    return _no_subprocess
@@ -3,59 +3,257 @@ Tests for BBC News Bulletin Scraper
 Basic smoke tests to validate the application structure.
 """
 
+import asyncio
+import copy
+import fcntl
+import http.client
+import importlib.util
+import io
+import json
+import logging
+import logging.handlers
+import multiprocessing
+import os
+import re
+import shutil
+import subprocess
 import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from unittest.mock import MagicMock
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+from zoneinfo import ZoneInfo
 
 import pytest
+import yaml
+
+import audio_processor
+import scraper as scraper_module
+from audio_processor import AudioProcessor
+from config_manager import ConfigManager
+from health_monitor import HealthMonitor
+from main import BBCBulletinScraper
+from scheduler import BulletinScheduler
+from scraper import BBCScraper
+
+# Application modules that must be importable from src
+REQUIRED_MODULES = (
+    "main",
+    "config_manager",
+    "scraper",
+    "audio_processor",
+    "scheduler",
+    "health_monitor",
+)
+
+# A loudnorm filter, capturing its integrated loudness target
+_LOUDNORM_RE = re.compile(r"loudnorm=(?:[^,\s]*:)?I=(-?\d+(?:\.\d+)?)")
+
+# Placeholder paths for building ffmpeg commands without real files
+FAKE_IN = Path("/fake/input.wav")
+FAKE_OUT = Path("/fake/output.wav")
+
+# Repository layout
+_REPO_ROOT = Path(__file__).resolve().parent.parent
+_SRC_DIR = _REPO_ROOT / "src"
+_CONFIG_PATH = _REPO_ROOT / "config" / "config.yaml"
+
+
+@pytest.fixture(scope="session")
+def build_command(audio_processor_factory):
+    """Build placeholder ffmpeg commands, once per distinct set of arguments.
+
+    Only for commands that don't probe the input, i.e. without an end trim.
+    """
+    processor = audio_processor_factory(format="wav")
+
+    @lru_cache(maxsize=None)
+    def build(trim_start, trim_end, normalise_lufs, output_format):
+        return tuple(
+            processor._build_ffmpeg_command(  # pylint: disable=protected-access
+                FAKE_IN,
+                FAKE_OUT,
+                trim_start_seconds=trim_start,
+                trim_end_seconds=trim_end,
+                normalise_lufs=normalise_lufs,
+                output_format=output_format,
+            )
+        )
 
-# Add src to path for testing
-sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+    return build
 
 
 class TestConfigManager:
     """Test configuration management."""
 
-    def test_config_manager_import(self):
+    def test_config_manager_import(self, config_manager):
         """Test that ConfigManager can be imported."""
-        from config_manager import ConfigManager
-
-        config_manager = ConfigManager()
         assert config_manager is not None
 
-    def test_config_validation_structure(self):
+    def test_config_validation_structure(self, config_manager):
         """Test configuration validation methods exist."""
-        from config_manager import ConfigManager
-
-        config_manager = ConfigManager()
         assert hasattr(config_manager, "_validate_config")
-        assert hasattr(config_manager, "_validate_programmes")
+
+    def test_load_config(self):
+        """Test the bundled configuration file loads and validates."""
+        config = ConfigManager(str(_CONFIG_PATH)).load_config()
+
+        assert config is not None
+        assert config["programmes"]
+        assert config["audio"]["format"] in ["mp3", "m4a", "wav"]
+
+    def test_config_validation(self):
+        """Test validation accepts a minimal config and rejects invalid settings."""
+        valid = {
+            "programmes": [{"name": "Bulletin", "url": "https://example.com"}],
+            "audio": {"format": "mp3", "quality": "std", "normalise_lufs": -16},
+            "scheduler": {"minutes_past_hour": [5, 35], "start_hour": 6},
+            "output": {"base_path": "./output"},
+        }
+        manager = ConfigManager()
+        manager.config = valid
+        assert manager._validate_config()
+
+        invalid_settings = [
+            ("programmes", []),
+            ("programmes", [{"name": "No URL"}]),
+            ("programmes", ["not a dict"]),
+            ("audio", {"trim_start_seconds": -1}),
+            ("audio", {"format": "ogg"}),
+            ("audio", {"quality": "best"}),
+            ("audio", {"normalise_mode": "peak"}),
+            ("audio", None),
+            ("scheduler", {"minutes_past_hour": [5, 60]}),
+            ("scheduler", {"minutes_past_hour": [-5]}),
+            ("scheduler", {"minutes_past_hour": [5.0]}),
+            ("scheduler", {"minutes_past_hour": ["5"]}),
+            ("scheduler", {"minutes_past_hour": [True]}),
+            ("scheduler", {"minutes_past_hour": [10**18]}),
+            ("scheduler", {"minutes_past_hour": []}),
+            ("scheduler", {"minutes_past_hour": [5], "end_hour": 24}),
+            ("output", {}),
+        ]
+        for section, value in invalid_settings:
+            manager.config = copy.deepcopy(valid)
+            manager.config[section] = value
+            assert not manager._validate_config(), f"{section}: {value} accepted"
+
+        manager.config = {k: v for k, v in valid.items() if k != "output"}
+        assert not manager._validate_config()
+
+    def test_generate_template_config(self):
+        """Test the template config is written in place and passes validation."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cwd = os.getcwd()
+            os.chdir(temp_dir)
+            try:
+                manager = ConfigManager()
+                template_path = manager._generate_template_config()
+
+                assert template_path == Path("config/config.yaml")
+                assert template_path.exists()
+                assert list(template_path.parent.iterdir()) == [template_path]
+                assert ConfigManager(str(template_path)).load_config() is not None
+            finally:
+                os.chdir(cwd)
+
+    def test_get_dot_notation(self):
+        """Test nested values and sections can be read with dot notation."""
+        manager = ConfigManager()
+        manager.config = {"audio": {"quality": "high", "normalise_lufs": None}}
+
+        assert manager.get("audio.quality") == "high"
+        assert manager.get("audio") == {"quality": "high", "normalise_lufs": None}
+        assert manager.get("audio.normalise_lufs", -16) is None
+        assert manager.get("audio.format", "mp3") == "mp3"
+        assert manager.get("audio.quality.bitrate") is None
+
+        # A newly loaded config replaces the lookup table
+        manager.config = {"audio": {"quality": "low"}}
+        assert manager.get("audio.quality") == "low"
+
+    def test_find_config_file(self):
+        """Test default config paths are searched in order and the result reused."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            local_path = Path(temp_dir) / "config-local.yaml"
+            default_path = Path(temp_dir) / "config.yaml"
+            default_path.write_text("programmes: []")
+
+            with patch.object(
+                ConfigManager, "_DEFAULT_PATHS", (local_path, default_path)
+            ):
+                manager = ConfigManager()
+                assert manager._find_config_file() == default_path
+                assert manager.has_valid_config()
+
+                # A missing file is searched for again
+                default_path.unlink()
+                assert manager._find_config_file() is None
+                assert not manager.has_valid_config()
+
+                local_path.write_text("programmes: []")
+                assert manager._find_config_file() == local_path
+
+    def test_config_reloaded_only_when_changed(self):
+        """Test the parsed config is reused until the file changes."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config_path = Path(temp_dir) / "config.yaml"
+            shutil.copy(_CONFIG_PATH, config_path)
+            manager = ConfigManager(str(config_path))
+
+            with patch.object(yaml, "load", wraps=yaml.load) as mock_load:
+                config = manager.load_config()
+                assert manager.load_config() is config
+                assert manager.reload_if_changed() is False
+                assert mock_load.call_count == 1
+
+                # A modified file is parsed again
+                config_path.write_text(
+                    config_path.read_text().replace("quality:", "quality: low #")
+                )
+                os.utime(config_path, ns=(0, 0))
+                assert manager.reload_if_changed() is True
+                assert manager.config["audio"]["quality"] == "low"
+                assert mock_load.call_count == 2
+
+            # Invalid configs are not parsed or validated again until changed
+            config_path.write_text(
+                config_path.read_text().replace("quality: low", "quality: best")
+            )
+            with patch.object(
+                manager, "_validate_config", wraps=manager._validate_config
+            ) as mock_validate:
+                assert manager.load_config() is None
+                assert manager.load_config() is None
+                assert manager.reload_if_changed() is False
+                mock_validate.assert_called_once()
 
 
 class TestAudioProcessor:
     """Test audio processing functionality."""
 
-    def test_audio_processor_import(self):
-        """Test that AudioProcessor can be imported."""
-        from audio_processor import AudioProcessor
+    @pytest.fixture(autouse=True)
+    def _warn_level(self, caplog):
+        """Capture warnings from every audio processor test."""
+        caplog.set_level(logging.WARNING)
 
-        config = {
-            "audio": {
-                "trim_start_seconds": 5,
-                "trim_end_seconds": 2,
-                "normalise_lufs": -16,
-                "quality": "high",
-            }
-        }
-        processor = AudioProcessor(config)
+    def test_audio_processor_import(self, audio_processor_factory):
+        """Test that AudioProcessor can be imported."""
+        processor = audio_processor_factory(
+            trim_start_seconds=5, trim_end_seconds=2, normalise_lufs=-16, quality="high"
+        )
         assert processor is not None
 
-    def test_audio_quality_mapping(self):
+    def test_audio_quality_mapping(self, audio_processor_factory):
         """Test audio quality mapping functions."""
-        from audio_processor import AudioProcessor
-
-        config = {"audio": {"quality": "high"}}
-        processor = AudioProcessor(config)
+        processor = audio_processor_factory(quality="high")
 
         # Test that the processor has the quality mapping method
         assert hasattr(processor, "_get_mp3_quality")
@@ -63,572 +261,1506 @@ class TestAudioProcessor:
         mp3_quality = processor._get_mp3_quality()  # pylint: disable=protected-access
         assert mp3_quality in ["320k", "192k", "128k", "96k"]
 
-    def test_normalise_lufs_processing(self):
-        """Test LUFS normalisation functionality."""
-        from audio_processor import AudioProcessor
-
-        # Test different normalise_lufs values
-        test_cases = [
+    @pytest.mark.parametrize(
+        "lufs_value,should_have_loudnorm",
+        [
             (None, False),  # Disabled
             (-16, True),  # Standard broadcast
             (-23, True),  # EBU R128
             (-14, True),  # Streaming
-        ]
-
-        for lufs_value, should_have_loudnorm in test_cases:
-            config = {"audio": {"normalise_lufs": lufs_value, "format": "wav"}}
-            processor = AudioProcessor(config)
-
-            # Build command (with fake paths)
-            cmd = processor._build_ffmpeg_command(
-                Path("/fake/input.wav"),
-                Path("/fake/output.wav"),
-                trim_start_seconds=0,
-                trim_end_seconds=0,
-                normalise_lufs=lufs_value,
-                output_format="wav",
-            )
+        ],
+    )
+    def test_normalise_lufs_processing(
+        self, build_command, lufs_value, should_have_loudnorm
+    ):
+        """Test LUFS normalisation functionality."""
+        # Build command (with fake paths)
+        cmd = build_command(0, 0, lufs_value, "wav")
 
-            # Check for loudnorm filter
-            has_loudnorm = any("loudnorm" in str(arg) for arg in cmd)
+        # Check for loudnorm filter and its integrated loudness target
+        match = _LOUDNORM_RE.search(" ".join(map(str, cmd)))
+        assert (
+            match is not None
+        ) == should_have_loudnorm, f"LUFS {lufs_value} loudnorm check failed"
+        if match:
             assert (
-                has_loudnorm == should_have_loudnorm
-            ), f"LUFS {lufs_value} loudnorm check failed"
-
-            # Check specific loudnorm parameters when enabled
-            if should_have_loudnorm:
-                loudnorm_filter = next(
-                    (arg for arg in cmd if "loudnorm" in str(arg)), None
-                )
-                assert (
-                    f"I={lufs_value}" in loudnorm_filter
-                ), f"LUFS target {lufs_value} not found in filter"
-
-    def test_legacy_normalise_fallback(self):
-        """Test legacy normalise boolean fallback."""
-        from audio_processor import AudioProcessor
+                float(match.group(1)) == lufs_value
+            ), f"LUFS target {lufs_value} not found in filter"
 
-        # Test legacy boolean settings
-        test_cases = [
+    @pytest.mark.parametrize(
+        "legacy_config,expected_lufs",
+        [
             ({"normalise": True}, -16),  # British spelling
             ({"normalize": True}, -16),  # American spelling
             ({"normalise": False}, None),  # Disabled British
             ({"normalize": False}, None),  # Disabled American
-        ]
+        ],
+    )
+    def test_legacy_normalise_fallback(
+        self, audio_processor_factory, legacy_config, expected_lufs
+    ):
+        """Test legacy normalise boolean fallback."""
+        processor = audio_processor_factory(**legacy_config, format="wav")
+
+        # Build command
+        cmd = processor._build_ffmpeg_command(
+            FAKE_IN,
+            FAKE_OUT,
+            trim_start_seconds=0,
+            trim_end_seconds=0,
+            normalise_lufs=expected_lufs,
+            output_format="wav",
+        )
+
+        # Check for loudnorm presence
+        has_loudnorm = _LOUDNORM_RE.search(" ".join(map(str, cmd))) is not None
+        should_have_loudnorm = expected_lufs is not None
+        assert (
+            has_loudnorm == should_have_loudnorm
+        ), f"Legacy {legacy_config} fallback failed"
 
-        for legacy_config, expected_lufs in test_cases:
-            config = {"audio": {**legacy_config, "format": "wav"}}
-            processor = AudioProcessor(config)
+    # Mock get_duration to return a known value (60 second file)
+    @patch.object(AudioProcessor, "get_duration", return_value=60.0)
+    def test_trim_end_functionality(self, _mock_duration, wav_processor):
+        """Test trim_end_seconds functionality."""
+        # Build command with trimming
+        cmd = wav_processor._build_ffmpeg_command(
+            FAKE_IN,
+            FAKE_OUT,
+            trim_start_seconds=4.0,
+            trim_end_seconds=2.0,
+            normalise_lufs=None,
+            output_format="wav",
+        )
+
+        # Check for duration limiting (-t parameter)
+        assert "-t" in cmd, "Duration limit not found for end trimming"
+
+        # Check calculated duration: 60 - 4 (start) - 2 (end) = 54 seconds
+        duration = cmd[cmd.index("-t") + 1]
+        assert float(duration) == 54.0, f"Expected duration 54.0, got {duration}"
+
+    @pytest.mark.parametrize(
+        "duration,trim_start,trim_end,expected_log",
+        [
+            # Cannot determine duration
+            (None, 0, 2.0, "Could not determine duration"),
+            # Invalid target duration (trim more than total: 4+2=6 > 5 total)
+            (5.0, 4.0, 2.0, "Calculated target duration"),
+        ],
+        ids=["unknown-duration", "over-trimmed"],
+    )
+    def test_trim_end_edge_cases(
+        self, wav_processor, caplog, duration, trim_start, trim_end, expected_log
+    ):
+        """Test trim_end_seconds edge cases."""
+        processor = wav_processor
 
-            # Build command
+        with patch.object(processor, "get_duration", return_value=duration):
             cmd = processor._build_ffmpeg_command(
-                Path("/fake/input.wav"),
-                Path("/fake/output.wav"),
-                trim_start_seconds=0,
-                trim_end_seconds=0,
-                normalise_lufs=expected_lufs,
+                FAKE_IN,
+                FAKE_OUT,
+                trim_start_seconds=trim_start,
+                trim_end_seconds=trim_end,
+                normalise_lufs=None,
                 output_format="wav",
             )
 
-            # Check for loudnorm presence
-            has_loudnorm = any("loudnorm" in str(arg) for arg in cmd)
-            should_have_loudnorm = expected_lufs is not None
-            assert (
-                has_loudnorm == should_have_loudnorm
-            ), f"Legacy {legacy_config} fallback failed"
+        # Should not have -t parameter when the trimmed duration isn't usable
+        assert "-t" not in cmd, "Duration limit should not be set"
+
+        # Should log a warning explaining why
+        assert any(expected_log in r.message for r in caplog.records)
+
+    @pytest.mark.xdist_group("audio")
+    @pytest.mark.parametrize(
+        "returncode,side_effect,lock_error,expected_success",
+        [
+            (0, None, None, True),
+            (1, None, None, False),
+            (None, subprocess.TimeoutExpired("ffmpeg", 300), None, False),
+            (0, None, BlockingIOError("Lock held"), True),
+        ],
+        ids=["success", "failure", "timeout", "locked"],
+    )
+    def test_atomic_file_operations(
+        self,
+        tmp_path,
+        monkeypatch,
+        wav_processor,
+        patched_subprocess,
+        returncode,
+        side_effect,
+        lock_error,
+        expected_success,
+    ):
+        """Test that temporary file handling prevents race conditions."""
+        input_file = tmp_path / "input.m4a"
+        output_file = tmp_path / "output.wav"
 
-    def test_trim_end_functionality(self):
-        """Test trim_end_seconds functionality."""
-        from unittest.mock import Mock
+        # Create a fake input file
+        input_file.write_text("fake audio data")
 
-        from audio_processor import AudioProcessor
+        mock_run = patched_subprocess
+        mock_run.return_value = SimpleNamespace(
+            returncode=returncode, stderr=b"FFmpeg error"
+        )
+        mock_run.side_effect = side_effect
+        if lock_error:
+            # Another process is already processing this output
+            monkeypatch.setattr("fcntl.flock", MagicMock(side_effect=lock_error))
+
+        success = wav_processor.process_audio(input_file, output_file)
+        assert success is expected_success
+
+        if lock_error:
+            # Considered successful since another process is handling it
+            mock_run.assert_not_called()
+        elif success:
+            # ffmpeg writes to a unique temp file, not directly to the output
+            mock_run.assert_called_once()
+            temp_file_used = mock_run.call_args[0][0][-1]
+            assert (
+                ".processing." in temp_file_used
+            ), "Should use unique temp file with .processing.{uuid}"
+            assert temp_file_used != str(
+                output_file
+            ), "Should not write directly to output file"
+        else:
+            # Failures and timeouts leave no output behind
+            assert not output_file.exists()
+
+    def test_process_batch(self, wav_processor):
+        """Test batch processing preserves job order and isolates failures."""
+        processor = wav_processor
+        jobs = [
+            (Path("/fake/a.m4a"), Path("/fake/a.wav"), None),
+            (Path("/fake/b.m4a"), Path("/fake/b.wav"), {"trim_start_seconds": 1.0}),
+            (Path("/fake/c.m4a"), Path("/fake/c.wav"), None),
+        ]
 
-        config = {"audio": {"trim_end_seconds": 2.0, "format": "wav"}}
-        processor = AudioProcessor(config)
+        thread_counts = set()
+
+        def fake_process(worker, input_file, output_file, programme_config=None):
+            thread_counts.add(worker.threads_per_job)
+            if input_file.name == "c.m4a":
+                raise RuntimeError("boom")
+            return input_file.name == "a.m4a"
+
+        def thread_pool(max_workers, **_pool_options):
+            return ThreadPoolExecutor(max_workers)
+
+        # Threads stand in for worker processes so the patch is visible
+        with (
+            patch("audio_processor.ProcessPoolExecutor", thread_pool),
+            patch("os.cpu_count", return_value=8),
+            patch.object(
+                AudioProcessor, "process_audio", autospec=True, side_effect=fake_process
+            ),
+        ):
+            results = processor.process_batch(jobs, max_workers=2)
+
+        assert results == [True, False, False]
+        assert processor.process_batch([]) == []
+
+        # The 8 cores are shared between the 2 workers' ffmpeg processes
+        assert thread_counts == {4}
+        cmd = AudioProcessor({"audio": {}}, threads_per_job=4)._build_ffmpeg_command(
+            FAKE_IN, FAKE_OUT, 1.0, 0, None, "wav"
+        )
+        assert cmd[cmd.index("-threads") + 1] == "4"
+        assert cmd[cmd.index("-filter_threads") + 1] == "4"
+        # The encoder is limited by an output option after the input
+        output_args = cmd[cmd.index("-i") + 2 :]
+        assert output_args[output_args.index("-threads") + 1] == "4"
+        assert "-threads" not in processor._build_ffmpeg_command(
+            FAKE_IN, FAKE_OUT, 1.0, 0, None, "wav"
+        )
 
-        # Mock get_duration to return a known value
-        original_get_duration = processor.get_duration
-        processor.get_duration = Mock(return_value=60.0)  # 60 second file
+    def test_process_many(self, audio_processor_factory, _no_subprocess):
+        """Test several jobs share one ffmpeg run, with per-file fallback."""
+        processor = audio_processor_factory(format="wav", normalise_lufs=-16)
 
-        try:
-            # Build command with trimming
-            cmd = processor._build_ffmpeg_command(
-                Path("/fake/input.wav"),
-                Path("/fake/output.wav"),
-                trim_start_seconds=4.0,
-                trim_end_seconds=2.0,
-                normalise_lufs=None,
-                output_format="wav",
-            )
+        with tempfile.TemporaryDirectory() as temp_dir:
+            jobs = [
+                (Path(temp_dir) / "a.m4a", Path(temp_dir) / "a.wav", None),
+                (
+                    Path(temp_dir) / "b.m4a",
+                    Path(temp_dir) / "b.wav",
+                    {"trim_start_seconds": 2.0},
+                ),
+            ]
+
+            def fake_ffmpeg(cmd, **kwargs):
+                # Write each temporary output named in the command
+                for arg in cmd:
+                    if ".processing." in arg:
+                        Path(arg).write_text("fake audio")
+                return SimpleNamespace(returncode=0, stderr=b"")
+
+            mock_run = _no_subprocess
+            mock_run.side_effect = fake_ffmpeg
+            with (
+                patch.object(processor, "get_duration", return_value=60.0),
+                patch.object(processor, "process_audio") as mock_process,
+            ):
+                assert processor.process_many(jobs) == [True, True]
 
-            # Check for duration limiting (-t parameter)
-            has_duration_limit = "-t" in cmd
-            assert has_duration_limit, "Duration limit not found for end trimming"
+                mock_run.assert_called_once()
+                cmd = mock_run.call_args[0][0]
+                assert cmd.count("-i") == 2
+                assert cmd[cmd.index("-ss") + 1] == "2.0"
+                assert cmd.index("-ss") < cmd.index(str(jobs[1][0]))
+                assert "0:a" in cmd and "1:a" in cmd
+                assert all(output.exists() for _, output, _ in jobs)
+                mock_process.assert_not_called()
+
+                # Existing outputs are skipped
+                assert processor.process_many(jobs) == [True, True]
+                mock_run.assert_called_once()
 
-            # Check calculated duration: 60 - 4 (start) - 2 (end) = 54 seconds
-            if "-t" in cmd:
-                t_index = cmd.index("-t")
-                duration = cmd[t_index + 1]
-                assert (
-                    float(duration) == 54.0
-                ), f"Expected duration 54.0, got {duration}"
+            for _, output_file, _ in jobs:
+                output_file.unlink()
 
-        finally:
-            # Restore original method
-            processor.get_duration = original_get_duration
+            # A failed combined run is retried per file, without leftover temp files
+            mock_run.side_effect = None
+            mock_run.return_value = SimpleNamespace(returncode=1, stderr=b"error")
+            with (
+                patch.object(processor, "get_duration", return_value=60.0),
+                patch.object(
+                    processor, "process_audio", return_value=True
+                ) as mock_process,
+            ):
+                assert processor.process_many(jobs) == [True, True]
+                assert mock_process.call_count == 2
+                assert not list(Path(temp_dir).glob("*.processing.*"))
 
-    def test_trim_end_edge_cases(self, caplog):
-        """Test trim_end_seconds edge cases."""
-        import logging
-        from unittest.mock import Mock
+            # Long inputs are processed file by file
+            mock_run.reset_mock()
+            with (
+                patch.object(processor, "get_duration", return_value=3600.0),
+                patch.object(
+                    processor, "process_audio", return_value=True
+                ) as mock_process,
+            ):
+                assert processor.process_many(jobs) == [True, True]
+                mock_run.assert_not_called()
+                assert mock_process.call_count == 2
 
-        from audio_processor import AudioProcessor
+    def test_process_audio_async(self, wav_processor):
+        """Test asynchronous processing moves output into place and handles timeouts."""
+        processor = wav_processor
 
-        config = {"audio": {"trim_end_seconds": 2.0, "format": "wav"}}
-        processor = AudioProcessor(config)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_file = Path(temp_dir) / "input.m4a"
+            output_file = Path(temp_dir) / "output.wav"
+            input_file.write_text("fake audio data")
 
-        # Test case 1: Cannot determine duration
-        processor.get_duration = Mock(return_value=None)
+            with (
+                patch.object(
+                    processor, "_run_ffmpeg", AsyncMock(return_value=(0, b"", b""))
+                ) as mock_run,
+                patch("pathlib.Path.replace") as mock_replace,
+            ):
+                success = asyncio.run(
+                    processor.process_audio_async(input_file, output_file)
+                )
 
-        with caplog.at_level(logging.WARNING):
-            cmd = processor._build_ffmpeg_command(
-                Path("/fake/input.wav"),
-                Path("/fake/output.wav"),
-                trim_start_seconds=0,
-                trim_end_seconds=2.0,
-                normalise_lufs=None,
-                output_format="wav",
+                assert success is True
+                cmd = mock_run.call_args[0][0]
+                assert ".processing." in cmd[-1]
+                mock_replace.assert_called_once_with(output_file)
+
+            with patch.object(
+                processor,
+                "_run_ffmpeg",
+                AsyncMock(side_effect=asyncio.TimeoutError),
+            ):
+                success = asyncio.run(
+                    processor.process_audio_async(input_file, output_file)
+                )
+
+            assert success is False
+            assert not output_file.exists()
+            # Lock is released after processing, so it can be taken again
+            lock_file = processor._lock_file_for(output_file)
+            assert lock_file.parent != output_file.parent
+            assert lock_file != processor._lock_file_for(
+                output_file.with_suffix(".mp3")
             )
+            lock_fd = os.open(str(lock_file), os.O_RDWR)
+            try:
+                fcntl.flock(lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            finally:
+                os.close(lock_fd)
+
+    def test_two_pass_loudnorm(self, audio_processor_factory, _no_subprocess):
+        """Test two-pass mode feeds measured loudness into the normalise filter."""
+        processor = audio_processor_factory(
+            format="wav", normalise_mode="loudnorm2pass"
+        )
+        measurement = (
+            "[Parsed_loudnorm_0 @ 0x0]\n"
+            '{\n\t"input_i" : "-21.75",\n\t"input_tp" : "-17.94",\n'
+            '\t"input_lra" : "0.10",\n\t"input_thresh" : "-31.75",\n'
+            '\t"target_offset" : "0.04"\n}\n'
+        )
 
-            # Should not have -t parameter when duration unknown
-            assert (
-                "-t" not in cmd
-            ), "Duration limit should not be set when duration unknown"
+        mock_run = _no_subprocess
+        mock_run.return_value = SimpleNamespace(returncode=0, stderr=measurement)
+        cmd = processor._build_ffmpeg_command(  # pylint: disable=protected-access
+            Path("/fake/input.m4a"),
+            FAKE_OUT,
+            trim_start_seconds=4.0,
+            trim_end_seconds=0,
+            normalise_lufs=-16,
+            output_format="wav",
+        )
 
-        # Should log warning
-        assert any(
-            "Could not determine duration" in record.message
-            for record in caplog.records
+        # Analysis pass covers the same trimmed audio and discards the output
+        analysis_cmd = mock_run.call_args[0][0]
+        assert analysis_cmd[analysis_cmd.index("-ss") + 1] == "4.0"
+        assert analysis_cmd[-3:] == ["-f", "null", "-"]
+        assert "print_format=json" in analysis_cmd[analysis_cmd.index("-af") + 1]
+
+        loudnorm_filter = cmd[cmd.index("-af") + 1]
+        assert loudnorm_filter.startswith("loudnorm=I=-16:")
+        assert "measured_I=-21.75" in loudnorm_filter
+        assert "offset=0.04" in loudnorm_filter
+        assert loudnorm_filter.endswith("linear=true")
+
+        # A failed measurement falls back to single-pass normalisation
+        mock_run.return_value = SimpleNamespace(returncode=1, stderr="error")
+        cmd = processor._build_ffmpeg_command(  # pylint: disable=protected-access
+            Path("/fake/input.m4a"),
+            FAKE_OUT,
+            trim_start_seconds=0,
+            trim_end_seconds=0,
+            normalise_lufs=-16,
+            output_format="wav",
         )
+        assert cmd[cmd.index("-af") + 1] == "loudnorm=I=-16:TP=-1.0:LRA=7.0"
 
-        # Clear logs for next test
-        caplog.clear()
+    def test_stream_copy_when_no_processing_needed(self, audio_processor_factory):
+        """Test unchanged audio in the target codec is copied, not re-encoded."""
+        processor = audio_processor_factory(format="mp3", quality="std")
 
-        # Test case 2: Invalid target duration (trim more than total)
-        processor.get_duration = Mock(return_value=5.0)  # 5 second file
+        def build(input_file, bit_rate, **overrides):
+            audio_info = {
+                "streams": [
+                    {"codec_type": "audio", "codec_name": "mp3", "bit_rate": bit_rate}
+                ]
+            }
+            args = {
+                "trim_start_seconds": 0,
+                "trim_end_seconds": 0,
+                "normalise_lufs": None,
+                "output_format": "mp3",
+                **overrides,
+            }
+            with patch.object(processor, "get_audio_info", return_value=audio_info):
+                return (
+                    processor._build_ffmpeg_command(  # pylint: disable=protected-access
+                        Path(input_file), Path("/fake/output.mp3"), **args
+                    )
+                )
 
-        with caplog.at_level(logging.WARNING):
-            cmd = processor._build_ffmpeg_command(
-                Path("/fake/input.wav"),
-                Path("/fake/output.wav"),
-                trim_start_seconds=4.0,  # Start trim
-                trim_end_seconds=2.0,  # End trim (4+2=6 > 5 total)
-                normalise_lufs=None,
-                output_format="wav",
-            )
+        # Same codec at or below the requested bitrate (192k) is copied
+        cmd = build("/fake/input.mp3", "128000")
+        assert cmd[cmd.index("-c") + 1] == "copy"
+        assert "-codec:a" not in cmd
+
+        # Higher source bitrate, other containers, or any processing re-encodes
+        for cmd in (
+            build("/fake/input.mp3", "320000"),
+            build("/fake/input.m4a", "128000"),
+            build("/fake/input.mp3", "128000", normalise_lufs=-16),
+            build("/fake/input.mp3", "128000", trim_start_seconds=1.0),
+        ):
+            assert "copy" not in cmd
+            assert cmd[cmd.index("-codec:a") + 1] == "libmp3lame"
+
+    def test_process_audio_from_memory(self, audio_processor_factory, _no_subprocess):
+        """Test in-memory audio is piped to ffmpeg instead of read from disk."""
+        processor = audio_processor_factory(format="mp3", trim_end_seconds=2.0)
 
-            # Should not have -t parameter when target duration invalid
-            assert (
-                "-t" not in cmd
-            ), "Duration limit should not be set when target duration invalid"
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_file = Path(temp_dir) / "output.mp3"
 
-        # Should log warning about invalid duration
-        assert any(
-            "Calculated target duration" in record.message for record in caplog.records
-        )
+            mock_run = _no_subprocess
+            mock_run.return_value = SimpleNamespace(returncode=1, stderr=b"")
+            with patch.object(processor, "get_duration") as mock_duration:
 
-    def test_atomic_file_operations(self):
-        """Test that temporary file handling prevents race conditions."""
-        import tempfile
-        from pathlib import Path
-        from unittest.mock import MagicMock, patch
+                processor.process_audio(b"fake audio data", output_file)
+                cmd = mock_run.call_args[0][0]
+                assert cmd[cmd.index("-i") + 1] == "pipe:0"
+                assert "-xerror" in cmd
+                assert mock_run.call_args[1]["input"] == b"fake audio data"
 
-        from audio_processor import AudioProcessor
+                # Streams without a file descriptor are read and piped the same way
+                processor.process_audio(io.BytesIO(b"streamed audio"), output_file)
+                assert mock_run.call_args[1]["input"] == b"streamed audio"
 
-        config = {"audio": {"format": "wav"}}
-        processor = AudioProcessor(config)
+                # Piped input can't be probed, so the end trim is skipped
+                assert "-t" not in cmd
+                mock_duration.assert_not_called()
+
+    def test_process_audio_reports_duration(self, wav_processor, _no_subprocess):
+        """Test the output duration is read from ffmpeg's progress output."""
+        processor = wav_processor
+
+        def fake_ffmpeg(cmd, **kwargs):
+            Path(cmd[-1]).write_bytes(b"processed")
+            progress = b"out_time_us=1000000\nprogress=continue\n"
+            progress += b"out_time_us=12500000\nprogress=end\n"
+            return SimpleNamespace(returncode=0, stdout=progress, stderr=b"")
 
         with tempfile.TemporaryDirectory() as temp_dir:
-            input_file = Path(temp_dir) / "input.m4a"
+            input_file = Path(temp_dir) / "input.wav"
+            input_file.write_bytes(b"RIFF")
             output_file = Path(temp_dir) / "output.wav"
 
-            # Create a fake input file
-            input_file.write_text("fake audio data")
+            mock_run = _no_subprocess
+            mock_run.side_effect = fake_ffmpeg
+            with patch.object(processor, "get_duration", return_value=None):
+                result = processor.process_audio_with_duration(input_file, output_file)
 
-            # Test successful processing with atomic move
-            with (
-                patch("subprocess.run") as mock_run,
-                patch("os.open") as mock_open,
-                patch("os.close"),
-                patch("pathlib.Path.replace") as mock_replace,
-            ):
+            assert result == (True, 12.5)
+            assert output_file.read_bytes() == b"processed"
+            cmd = mock_run.call_args[0][0]
+            assert cmd[1:3] == ["-progress", "pipe:1"]
+
+            # An existing output wasn't produced here, so there's no duration
+            assert processor.process_audio_with_duration(input_file, output_file) == (
+                True,
+                None,
+            )
 
-                # Mock successful ffmpeg execution
-                mock_result = MagicMock()
-                mock_result.returncode = 0
-                mock_run.return_value = mock_result
+    def test_validate_batch(self, wav_processor):
+        """Test batch validation agrees with validate_audio_file for each file."""
+        processor = wav_processor
 
-                # Mock file lock
-                mock_open.return_value = 123  # fake file descriptor
+        with tempfile.TemporaryDirectory() as temp_dir:
+            contents = {
+                "bulletin.mp3": b"ID3\x04\x00\x00\x00\x00\x00\x00\x00\x00",
+                "bulletin.flac": b"fLaC\x00\x00\x00\x22",
+                "page.html": b"<!DOCTYPE html>",
+                "empty.mp3": b"",
+            }
+            paths = []
+            for name, content in contents.items():
+                paths.append(Path(temp_dir) / name)
+                paths[-1].write_bytes(content)
+            paths.append(Path(temp_dir) / "missing.mp3")
 
-                # Mock the atomic file move operation
-                mock_replace.return_value = None
+            def fake_validate(path):
+                return path.suffix != ".html"
 
-                success = processor.process_audio(input_file, output_file)
+            with patch.object(
+                processor, "validate_audio_file", side_effect=fake_validate
+            ) as mock_validate:
+                results = processor.validate_batch(paths)
 
-                # Verify success
-                assert success is True
+            assert results == [True, True, False, False, False]
+            # Missing and empty files are rejected without probing
+            assert mock_validate.call_count == 3
+            assert processor.validate_batch([]) == []
 
-                # Verify subprocess was called with temp file as output
-                mock_run.assert_called_once()
-                call_args = mock_run.call_args[0][0]  # Get the command args
-
-                # Find the temp file in the command (should be after -i input_file)
-                temp_file_used = None
-                for i, arg in enumerate(call_args):
-                    if arg == str(input_file) and i > 0:
-                        # The output file should be the last argument
-                        temp_file_used = call_args[-1]
-                        break
-
-                assert temp_file_used is not None
-                assert (
-                    ".processing." in temp_file_used
-                ), "Should use unique temp file with .processing.{uuid}"
-                assert temp_file_used != str(
-                    output_file
-                ), "Should not write directly to output file"
-
-            # Test failure cleanup
+    def test_duration_from_container_header(self, wav_processor):
+        """Test durations come from mutagen when possible, ffprobe otherwise."""
+        processor = wav_processor
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            m4a_file = Path(temp_dir) / "input.m4a"
+            m4a_file.write_text("fake audio data")
+            ogg_file = Path(temp_dir) / "input.ogg"
+            ogg_file.write_text("fake audio data")
+
+            mutagen_file = MagicMock()
+            mutagen_file.return_value.info.length = 42.5
+            with (
+                patch("audio_processor.MutagenFile", mutagen_file),
+                patch.object(
+                    processor, "_get_duration_ffprobe", return_value=60.0
+                ) as mock_ffprobe,
+            ):
+                assert processor.get_duration(m4a_file) == 42.5
+                assert processor.validate_audio_file(m4a_file) is True
+                mock_ffprobe.assert_not_called()
+
+                # Other containers, and headers mutagen can't parse, use ffprobe
+                assert processor.get_duration(ogg_file) == 60.0
+                mutagen_file.side_effect = ValueError("not an audio file")
+                assert processor.get_duration(m4a_file) == 60.0
+                assert mock_ffprobe.call_count == 2
+
+            # Without mutagen installed, ffprobe is always used
             with (
-                patch("subprocess.run") as mock_run,
-                patch("os.open") as mock_open,
-                patch("os.close"),
-                patch("pathlib.Path.replace") as mock_replace_fail,
+                patch("audio_processor.MutagenFile", None),
+                patch.object(
+                    processor, "_get_duration_ffprobe", return_value=60.0
+                ) as mock_ffprobe,
             ):
+                assert processor.get_duration(m4a_file) == 60.0
+                mock_ffprobe.assert_called_once()
+
+    def test_audio_info_cached_until_file_changes(self, wav_processor, _no_subprocess):
+        """Test ffprobe results are reused until the file is modified."""
+        processor = wav_processor
+        probe_output = {"format": {"duration": "60.0"}, "streams": []}
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            audio_file = Path(temp_dir) / "input.m4a"
+            audio_file.write_text("fake audio data")
+
+            audio_processor._probe.cache_clear()  # pylint: disable=protected-access
+            mock_run = _no_subprocess
+            mock_run.return_value = SimpleNamespace(
+                returncode=0, stdout=json.dumps(probe_output).encode()
+            )
+
+            assert processor.get_duration(audio_file) == 60.0
+            assert processor.get_audio_info(audio_file) == probe_output
+            mock_run.assert_called_once()
+            assert {"-show_format", "-show_streams"} <= set(mock_run.call_args.args[0])
+
+            # Callers get their own copy of the cached result
+            processor.get_audio_info(audio_file)["format"]["duration"] = "0"
+            assert processor.get_audio_info(audio_file) == probe_output
+            mock_run.assert_called_once()
 
-                # Mock failed ffmpeg execution
-                mock_result = MagicMock()
-                mock_result.returncode = 1
-                mock_result.stderr = "FFmpeg error"
-                mock_run.return_value = mock_result
+            # A modified file is probed again
+            audio_file.write_text("different fake audio data")
+            os.utime(audio_file, ns=(0, 0))
+            processor.get_audio_info(audio_file)
+            assert mock_run.call_count == 2
 
-                # Mock file lock
-                mock_open.return_value = 123
+            # Failures are not cached
+            mock_run.return_value = SimpleNamespace(returncode=1, stderr=b"bad")
+            audio_file.write_text("more fake audio data")
+            assert processor.get_audio_info(audio_file) is None
+            assert processor.get_audio_info(audio_file) is None
+            assert mock_run.call_count == 4
+
+
+class TestScraper:
+    """Test BBC scraper functionality."""
+
+    def test_download_programmes_in_parallel(self):
+        """Test enabled programmes are downloaded concurrently, in order."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config = {
+                "download": {"temp_path": temp_dir, "max_concurrent": 2},
+                "output": {"base_path": temp_dir},
+                "get_iplayer": {"cache_dir": temp_dir},
+                "programmes": [
+                    {"name": "First"},
+                    {"name": "Skipped", "enabled": False},
+                    {"name": "Second"},
+                ],
+            }
+            with patch.object(BBCScraper, "_verify_get_iplayer"):
+                scraper = BBCScraper(config)
+
+            # Both downloads must be in progress at once to pass the barrier
+            barrier = threading.Barrier(2, timeout=5)
+
+            def fake_download(programme):
+                barrier.wait()
+                if programme["name"] == "Second":
+                    raise RuntimeError("boom")
+                return {"programme": programme, "success": True, "files": []}
+
+            with patch.object(scraper, "download_programme", fake_download):
+                results = scraper.download_programmes()
+
+        assert [r["programme"]["name"] for r in results] == ["First", "Second"]
+        assert results[0]["success"] is True
+        assert results[1] == {
+            "programme": {"name": "Second"},
+            "success": False,
+            "error": "boom",
+            "files": [],
+        }
+
+    def test_concurrent_downloads_keep_their_own_files(self):
+        """Test programmes sharing keywords never pick up each other's files."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config = {
+                "download": {"temp_path": temp_dir, "max_concurrent": 2},
+                "output": {"base_path": temp_dir},
+                "get_iplayer": {"cache_dir": temp_dir},
+                "programmes": [
+                    {"name": "Radio 4 News", "url": "p08dy4zh"},
+                    {"name": "Radio 1 News", "url": "p08dy4zj"},
+                ],
+            }
+            with patch.object(BBCScraper, "_verify_get_iplayer"):
+                scraper = BBCScraper(config)
 
-                # Mock the atomic file move operation (won't be called on failure)
-                mock_replace_fail.return_value = None
+            # Both downloads must be in progress at once to pass the barrier
+            barrier = threading.Barrier(2, timeout=5)
 
-                success = processor.process_audio(input_file, output_file)
+            def fake_run(cmd):
+                barrier.wait()
+                download_dir = Path(cmd[cmd.index("--output") + 1])
+                pid = cmd[cmd.index("--pid") + 1]
+                (download_dir / f"Radio_News_{pid}.m4a").write_bytes(b"a")
+                # Both files exist before either programme looks for its own
+                barrier.wait()
+                return 0, ""
 
-                # Verify failure
-                assert success is False
+            processed = {}
 
-                # Verify output file was not created
-                assert not output_file.exists()
+            def fake_process(input_file, output_file, programme_config=None):
+                processed[output_file.stem] = input_file.name
+                output_file.write_bytes(b"audio")
+                return True, 1.0
 
-            # Test timeout cleanup
             with (
-                patch("subprocess.run") as mock_run,
-                patch("os.open") as mock_open,
-                patch("os.close") as mock_close,
+                patch.object(scraper, "_run_get_iplayer", fake_run),
+                patch.object(
+                    scraper.audio_processor, "process_audio_with_duration", fake_process
+                ),
             ):
+                results = scraper.download_programmes()
 
-                # Mock timeout
-                import subprocess
+        assert all(r["success"] for r in results)
+        assert processed == {
+            "radio_4_news": "Radio_News_p08dy4zh.m4a",
+            "radio_1_news": "Radio_News_p08dy4zj.m4a",
+        }
 
-                mock_run.side_effect = subprocess.TimeoutExpired("ffmpeg", 300)
+        # Names that read the same once made safe still get their own directory
+        assert scraper_module._programme_slug(
+            {"name": "Radio 4 News"}
+        ) != scraper_module._programme_slug({"name": "Radio-4 News"})
 
-                # Mock file lock
-                mock_open.return_value = 123
+    def test_find_downloaded_files(self):
+        """Test the newest complete, recent file for a programme is found."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config = {
+                "download": {"temp_path": temp_dir},
+                "output": {"base_path": temp_dir},
+                "get_iplayer": {"cache_dir": temp_dir},
+            }
+            with patch.object(BBCScraper, "_verify_get_iplayer"):
+                scraper = BBCScraper(config)
+
+            now = time.time()
+            files = {
+                "Radio_Wales_News_old.m4a": now - 60,
+                "Radio_Wales_News_new.m4a": now - 10,
+                "Radio_Wales_News_stale.m4a": now - 7200,
+                "Radio_Wales_News.partial.mp3": now,
+                "Radio_Wales_News_notes.txt": now,
+                "Other_Programme.mp3": now,
+            }
+            for name, mtime in files.items():
+                path = Path(temp_dir) / name
+                path.touch()
+                os.utime(path, (mtime, mtime))
+
+            assert scraper._is_recent_file(Path(temp_dir) / "Other_Programme.mp3")
+            assert not scraper._is_recent_file(
+                Path(temp_dir) / "Radio_Wales_News_stale.m4a"
+            )
+            assert not scraper._is_recent_file(Path(temp_dir) / "missing.mp3")
 
-                success = processor.process_audio(input_file, output_file)
+            # Nothing here needs audio processing, so no processor is made
+            assert "audio_processor" not in vars(scraper)
 
-                # Verify failure
-                assert success is False
+            found = scraper._find_downloaded_files("BBC Radio Wales News")
+            assert found == [Path(temp_dir) / "Radio_Wales_News_new.m4a"]
+            assert scraper._find_downloaded_files("Missing Show") == []
 
-                # Verify output file was not created
-                assert not output_file.exists()
+    def test_build_get_iplayer_command(self):
+        """Test get_iplayer commands combine programme and static options."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config = {
+                "download": {"temp_path": temp_dir},
+                "output": {"base_path": temp_dir},
+                "get_iplayer": {
+                    "cache_dir": temp_dir,
+                    "since_hours": 6,
+                    "extra_options": ["--quiet"],
+                },
+                "audio": {"quality": "med"},
+            }
+            with patch.object(BBCScraper, "_verify_get_iplayer"):
+                scraper = BBCScraper(config)
 
-            # Test file locking prevents concurrent processing
-            with patch("subprocess.run") as mock_run, patch("os.open") as mock_open:
+            programme = {
+                "url": "https://www.bbc.co.uk/programmes/p08dy4zh",
+                "pid_recursive": True,
+            }
+            cmd = scraper._build_get_iplayer_command(programme)
+            download_dir = Path(temp_dir) / scraper_module._programme_slug(programme)
+
+            assert cmd == [
+                "get_iplayer",
+                "--pid",
+                "p08dy4zh",
+                "--pid-recursive",
+                "--since",
+                "6",
+                "--output",
+                str(download_dir),
+                "--radio-quality",
+                "med",
+                "--profile-dir",
+                temp_dir,
+                "--available-since",
+                "12",
+                "--type",
+                "radio",
+                "--get",
+                "--verbose",
+                "--overwrite",
+                "--force",
+                "--quiet",
+            ]
+
+            cmd = scraper._build_get_iplayer_command({"url": "https://example.com/x"})
+            assert cmd[1:3] == ["--url", "https://example.com/x"]
+            assert "--pid-recursive" not in cmd
+
+            with pytest.raises(ValueError):
+                scraper._build_get_iplayer_command({"name": "No URL"})
+
+    def test_directories_created_once(self):
+        """Test scraper directories are created, once per process."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            base = Path(temp_dir)
+            config = {
+                "download": {"temp_path": str(base / "downloads")},
+                "output": {"base_path": str(base / "output")},
+                "get_iplayer": {"cache_dir": str(base / "cache")},
+            }
+            with patch.object(BBCScraper, "_verify_get_iplayer"):
+                BBCScraper(config)
+                assert (base / "downloads").is_dir()
+                assert (base / "output").is_dir()
+                assert (base / "cache").is_dir()
+
+                with patch.object(Path, "mkdir") as mock_mkdir:
+                    BBCScraper(config)
+                mock_mkdir.assert_not_called()
+
+    def test_extract_pid_from_url(self):
+        """Test programme PIDs are taken from URLs or used as given."""
+        extract = BBCScraper._extract_pid_from_url
+        assert extract(None, "https://www.bbc.co.uk/programmes/p08dy4zh") == (
+            "p08dy4zh"
+        )
+        assert extract(None, "p08m00gv") == "p08m00gv"
+        assert extract(None, "https://example.com/not-a-pid") is None
+        assert extract(None, "") is None
 
-                # Mock file lock failure (another process is processing)
-                mock_open.side_effect = FileExistsError("Lock file exists")
+    def test_get_iplayer_output_streamed(self):
+        """Test get_iplayer output is streamed, keeping only its tail."""
+        script = "import sys\nfor i in range(1000): print('line', i)\nsys.exit(2)"
 
-                success = processor.process_audio(input_file, output_file)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config = {
+                "download": {"temp_path": temp_dir, "timeout_seconds": 0.5},
+                "output": {"base_path": temp_dir},
+                "get_iplayer": {"cache_dir": temp_dir},
+            }
+            with patch.object(BBCScraper, "_verify_get_iplayer"):
+                scraper = BBCScraper(config)
 
-                # Should return True (considers it successful since another process is handling it)
-                assert success is True
+            returncode, output = scraper._run_get_iplayer(
+                [sys.executable, "-c", script]
+            )
+            assert returncode == 2
+            lines = output.splitlines()
+            assert len(lines) == 64
+            assert lines[-1] == "line 999"
+
+            # A failed run reports the end of its output as the error
+            with patch.object(
+                scraper,
+                "_build_get_iplayer_command",
+                return_value=[sys.executable, "-c", script],
+            ):
+                result = scraper.download_programme({"name": "Test"})
+            assert result["success"] is False
+            assert result["error"].endswith("line 999")
 
-                # subprocess.run should not be called since lock failed
-                mock_run.assert_not_called()
+            with pytest.raises(subprocess.TimeoutExpired):
+                scraper._run_get_iplayer(
+                    [sys.executable, "-c", "import time; time.sleep(30)"]
+                )
+
+    def test_download_programmes_async(self):
+        """Test programmes can be downloaded concurrently with asyncio."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config = {
+                "download": {"temp_path": temp_dir, "timeout_seconds": 2},
+                "output": {"base_path": temp_dir},
+                "get_iplayer": {"cache_dir": temp_dir},
+                "programmes": [
+                    {"name": "Done", "exit": 0},
+                    {"name": "Broken", "exit": 3},
+                    {"name": "Slow", "exit": 0, "sleep": 30},
+                ],
+            }
+            with patch.object(BBCScraper, "_verify_get_iplayer"):
+                scraper = BBCScraper(config)
+
+            def fake_command(programme):
+                return [
+                    sys.executable,
+                    "-c",
+                    f"import sys, time; print('{programme['name']}'); "
+                    f"time.sleep({programme.get('sleep', 0)}); "
+                    f"sys.exit({programme['exit']})",
+                ]
+
+            with patch.object(
+                scraper, "_build_get_iplayer_command", side_effect=fake_command
+            ):
+                results = asyncio.run(scraper.download_programmes_async())
+
+        done, broken, slow = results
+        assert done["success"] is True
+        assert done["raw_output"] == "Done"
+        assert done["files"] == []
+        assert broken == {
+            "programme": config["programmes"][1],
+            "success": False,
+            "error": "Broken",
+            "files": [],
+        }
+        assert slow["success"] is False
+        assert slow["error"] == "Download timeout for Slow"
+
+    def test_async_output_with_carriage_returns(self):
+        """Test long runs of progress output without newlines are read."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config = {
+                "download": {"temp_path": temp_dir},
+                "output": {"base_path": temp_dir},
+                "get_iplayer": {"cache_dir": temp_dir},
+            }
+            with patch.object(BBCScraper, "_verify_get_iplayer"):
+                scraper = BBCScraper(config)
+
+            # Far more than the 64 KiB line limit of asyncio's stream reader
+            cmd = [
+                sys.executable,
+                "-c",
+                "import sys; "
+                "sys.stdout.write(''.join(f'{i}%\\r' for i in range(50000))); "
+                "print(); print('Finished')",
+            ]
+            returncode, output = asyncio.run(scraper._run_get_iplayer_async(cmd))
+
+        assert returncode == 0
+        assert output.splitlines()[-2:] == ["49999%", "Finished"]
+
+    def test_cleanup_temp_file(self):
+        """Test temp files are removed, and a missing file is not an error."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config = {
+                "download": {"temp_path": temp_dir},
+                "output": {"base_path": temp_dir},
+                "get_iplayer": {"cache_dir": temp_dir},
+            }
+            with patch.object(BBCScraper, "_verify_get_iplayer"):
+                scraper = BBCScraper(config)
+
+            temp_file = Path(temp_dir) / "bulletin.m4a"
+            temp_file.touch()
+            scraper._cleanup_temp_file(temp_file)
+            assert not temp_file.exists()
+
+            # Already gone, so there's nothing to report
+            with patch("logging.warning") as mock_warning:
+                scraper._cleanup_temp_file(temp_file)
+            mock_warning.assert_not_called()
+
+            with (
+                patch("os.unlink", side_effect=PermissionError("denied")),
+                patch("logging.warning") as mock_warning,
+            ):
+                scraper._cleanup_temp_file(temp_file)
+            mock_warning.assert_called_once()
+
+    def test_processed_downloads_skipped(self):
+        """Test a download processed before isn't transcoded again."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            base = Path(temp_dir)
+            config = {
+                "download": {"temp_path": str(base / "downloads")},
+                "output": {"base_path": str(base / "output")},
+                "get_iplayer": {"cache_dir": str(base / "cache")},
+                "audio": {"format": "mp3"},
+            }
+            programme = {"name": "News", "output_name": "news"}
+
+            def fake_process(input_file, output_file, programme_config):
+                output_file.write_bytes(b"processed")
+                return True, 60.0
+
+            def download(name, content=b"downloaded"):
+                input_file = base / "downloads" / name
+                input_file.write_bytes(content)
+                return input_file
+
+            with patch.object(BBCScraper, "_verify_get_iplayer"):
+                scraper = BBCScraper(config)
+            scraper.audio_processor = MagicMock()
+            scraper.audio_processor.process_audio_with_duration.side_effect = (
+                fake_process
+            )
+
+            first = scraper._process_downloaded_file(
+                download("News_-_10_00_m0012abc_original.m4a"), programme
+            )
+            assert first["duration_seconds"] == 60.0
+            output_st = os.stat(first["output_file"])
+            assert first["file_size_bytes"] == output_st.st_size == len(b"processed")
+            assert first["processed_at"] == (
+                datetime.fromtimestamp(output_st.st_mtime).isoformat()
+            )
+            assert (base / "cache" / "processed.json").exists()
+
+            # The same episode downloaded again under a new name, seen by a new
+            # scraper, reuses the result
+            with patch.object(BBCScraper, "_verify_get_iplayer"):
+                scraper = BBCScraper(config)
+            scraper.audio_processor = MagicMock()
+            scraper.audio_processor.process_audio_with_duration.side_effect = (
+                fake_process
+            )
+
+            input_file = download("News_-_m0012abc.m4a")
+            with patch.object(
+                scraper_module, "_file_digest", wraps=scraper_module._file_digest
+            ) as digest:
+                assert scraper._process_downloaded_file(input_file, programme) == first
+            scraper.audio_processor.process_audio_with_duration.assert_not_called()
+            assert not input_file.exists()
+            # Hashed only to confirm the episode and size match
+            digest.assert_called_once()
+
+            # The same episode and size with other contents is processed again
+            input_file = download("News_-_m0012abc.m4a", b"DOWNLOADED")
+            assert scraper._process_downloaded_file(input_file, programme)
+            scraper.audio_processor.process_audio_with_duration.assert_called_once()
+
+            # A new bulletin is processed as usual
+            input_file = download("News_-_11_00_m0012abd.m4a", b"new bulletin")
+            assert scraper._process_downloaded_file(input_file, programme)
+            assert scraper.audio_processor.process_audio_with_duration.call_count == 2
+
+    def test_get_iplayer_verified_once(self, _no_subprocess, caplog):
+        """Test get_iplayer is looked up once and only run when asked."""
+        mock_run = _no_subprocess
+        caplog.set_level(logging.INFO)
+        scraper_module._verified_get_iplayer.cache_clear()
+        try:
+            with patch("shutil.which", return_value=None):
+                with pytest.raises(RuntimeError, match="get_iplayer not found"):
+                    scraper_module._verified_get_iplayer()
+
+            with (
+                patch(
+                    "shutil.which", return_value="/usr/bin/get_iplayer"
+                ) as mock_which,
+                patch.dict(os.environ, {"BBC_SCRAPER_VERIFY": "0"}),
+            ):
+                assert scraper_module._verified_get_iplayer() == "/usr/bin/get_iplayer"
+                assert scraper_module._verified_get_iplayer() == "/usr/bin/get_iplayer"
+            mock_which.assert_called_once()
+            mock_run.assert_not_called()
+            assert "get_iplayer found at /usr/bin/get_iplayer" in caplog.messages
+            assert "get_iplayer verification successful" not in caplog.messages
+
+            scraper_module._verified_get_iplayer.cache_clear()
+            with (
+                patch("shutil.which", return_value="/usr/bin/get_iplayer"),
+                patch.dict(os.environ, {"BBC_SCRAPER_VERIFY": "1"}),
+            ):
+                scraper_module._verified_get_iplayer()
+            mock_run.assert_called_once()
+            assert "get_iplayer verification successful" in caplog.messages
+        finally:
+            scraper_module._verified_get_iplayer.cache_clear()
 
 
 class TestScheduler:
     """Test scheduling functionality."""
 
-    def test_scheduler_import(self):
+    def test_scheduler_import(self, scheduler):
         """Test that BulletinScheduler can be imported."""
-        from scheduler import BulletinScheduler
-
-        config = {"scheduler": {"minutes_past_hour": [5]}}
-        scraper_mock = MagicMock()
-
-        scheduler = BulletinScheduler(config, scraper_mock)
         assert scheduler is not None
 
-    def test_scheduler_status(self):
+    def test_scheduler_status(self, scheduler):
         """Test scheduler status functionality."""
-        from scheduler import BulletinScheduler
-
-        config = {"scheduler": {"minutes_past_hour": [5]}}
-        scraper_mock = MagicMock()
-
-        scheduler = BulletinScheduler(config, scraper_mock)
         status = scheduler.get_status()
 
         assert "running" in status
         assert "total_runs" in status
         assert "next_jobs" in status
 
+    def test_download_results_summary(self):
+        """Test download results are counted correctly."""
+        results = [
+            {"success": True, "files": ["a.mp3", "b.mp3"]},
+            {"success": True, "files": None},
+            {"success": False, "error": "boom"},
+        ]
+        scraper_stub = SimpleNamespace(download_programmes=lambda: results)
+        scheduler = BulletinScheduler({"scheduler": {}}, scraper_stub)
+
+        summary = scheduler.trigger_download_now()
+        assert summary["programmes_successful"] == 2
+        assert summary["programmes_failed"] == 1
+        assert summary["total_files"] == 2
+
+        scheduler._execute_download()
+        assert scheduler.successful_runs == 1
+        assert scheduler.total_runs == 1
+
+    def test_scheduler_timezone(self, scraper_stub):
+        """Test the configured timezone is applied to scheduled jobs."""
+        config = {"scheduler": {"minutes_past_hour": [5], "timezone": "Europe/London"}}
+        scheduler = BulletinScheduler(config, scraper_stub)
+        scheduler._schedule_download_jobs()
+
+        assert scheduler.timezone == ZoneInfo("Europe/London")
+        (job,) = scheduler.scheduler.get_jobs()
+        assert job.trigger.timezone == ZoneInfo("Europe/London")
+
+        # All configured minutes share one job
+        config["scheduler"]["minutes_past_hour"] = [35, 5, 35]
+        scheduler = BulletinScheduler(config, scraper_stub)
+        scheduler._schedule_download_jobs()
+        (job,) = scheduler.scheduler.get_jobs()
+        assert job.id == "download_bulletins"
+        assert str(job.trigger.fields[6]) == "5,35"
+
+        # Unknown zones fall back to the system local timezone
+        config["scheduler"]["timezone"] = "Not/A_Zone"
+        assert BulletinScheduler(config, scraper_stub).timezone is None
+
 
 class TestHealthMonitor:
     """Test health monitoring functionality."""
 
-    def test_health_monitor_import(self):
+    def test_health_monitor_import(self, health_monitor):
         """Test that HealthMonitor can be imported."""
-        from health_monitor import HealthMonitor
-
-        config = {"health": {"enabled": False}}  # Disable HTTP server for test
-        monitor = HealthMonitor(config)
-        assert monitor is not None
+        assert health_monitor is not None
 
-    def test_health_status_structure(self):
+    def test_health_status_structure(self, health_monitor):
         """Test health status response structure."""
-        from health_monitor import HealthMonitor
-
-        config = {"health": {"enabled": False}}
-        monitor = HealthMonitor(config)
-
-        status = monitor.get_health_status()
+        status = health_monitor.get_health_status()
 
         assert "healthy" in status
         assert "timestamp" in status
         assert "checks" in status
         assert isinstance(status["checks"], list)
 
+    def test_detailed_status_configuration(self):
+        """Test the status endpoint reports the configuration it started with."""
+        config = {
+            "health": {"enabled": False},
+            "app": {"name": "Test Scraper", "version": "2.0.0"},
+            "output": {"base_path": "."},
+            "audio": {"trim_start_seconds": 3, "normalise_lufs": -16},
+            "programmes": [{"name": "a"}, {"name": "b", "enabled": False}],
+        }
+        monitor = HealthMonitor(config)
+
+        status = monitor.get_detailed_status()
+
+        assert status["application"]["name"] == "Test Scraper"
+        assert status["application"]["version"] == "2.0.0"
+        assert status["configuration"] == {
+            "programmes_enabled": 1,
+            "output_path": ".",
+            "trim_start_seconds": 3,
+            "trim_end_seconds": 0,
+            "normalise_lufs": -16,
+        }
+        assert "Failed" not in monitor._check_disk_space()["message"]
+
+    def test_disk_space_thresholds_unrounded(self):
+        """Test disk space just under a threshold fails, though shown rounded up."""
+        monitor = HealthMonitor({"health": {"enabled": False}})
+        gb = 1024**3
+
+        with patch.object(
+            monitor, "_disk_snapshot", return_value=(100 * gb, 0, int(0.96 * gb))
+        ):
+            check = monitor._check_disk_space()
+        assert check["status"] == "fail"
+        assert check["message"] == "Low disk space: 1.0GB (1.0%) free"
+
+        with patch.object(
+            monitor, "_disk_snapshot", return_value=(100 * gb, 0, int(9.96 * gb))
+        ):
+            check = monitor._check_disk_space()
+        assert check["status"] == "fail"
+        assert check["message"] == "Low disk space: 10.0GB (10.0%) free"
+
+        # Each call gets its own copy of the cached result
+        check["status"] = "pass"
+        with patch.object(
+            monitor, "_disk_snapshot", return_value=(100 * gb, 0, int(9.96 * gb))
+        ):
+            assert monitor._check_disk_space()["status"] == "fail"
+
+    def test_health_results_cached(self):
+        """Test health results are reused within their TTL."""
+        monitor = HealthMonitor({"health": {"enabled": False}})
+
+        with patch("time.monotonic", return_value=1000.0):
+            metrics = monitor.get_metrics()
+            monitor.record_error()
+            assert monitor.get_metrics() is metrics
+
+            # The encoded body is reused along with the result
+            with patch("health_monitor._dumps") as mock_dumps:
+                _result, body, etag = monitor.get_response("metrics")
+            mock_dumps.assert_not_called()
+            assert json.loads(body) == metrics
+            assert etag.startswith('"')
+
+        with patch("time.monotonic", return_value=1010.0):
+            assert monitor.get_metrics()["error_count_total"] == 1
+
+        # Resetting the counters discards cached results straight away
+        monitor.reset_counters()
+        with patch("time.monotonic", return_value=1010.0):
+            assert monitor.get_metrics()["error_count_total"] == 0
+
+    def test_counters_thread_safe(self):
+        """Test concurrent error and warning records are all counted."""
+        monitor = HealthMonitor({"health": {"enabled": False}})
+
+        def record():
+            for _ in range(1000):
+                monitor.record_error()
+                monitor.record_warning()
+
+        threads = [threading.Thread(target=record) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert monitor.error_count == 8000
+        assert monitor.warning_count == 8000
+
+    def test_check_results_reused(self):
+        """Test reused check results are handed out as separate copies."""
+        monitor = HealthMonitor({"health": {"enabled": False}})
+
+        first = monitor._check_recent_errors()
+        assert first["status"] == "pass"
+        first["status"] = "fail"
+        assert monitor._check_recent_errors()["status"] == "pass"
+
+        for _ in range(11):
+            monitor.record_error()
+        check = monitor._check_recent_errors()
+        assert check["status"] == "fail"
+        assert check["message"] == "High error count: 11 errors"
+
+    def test_disk_checked_once_per_snapshot(self):
+        """Test health and metrics share one disk reading."""
+        monitor = HealthMonitor({"health": {"enabled": False}})
+        gib = 1024**3 // 4096
+        fake_stat = SimpleNamespace(
+            f_frsize=4096, f_blocks=100 * gib, f_bfree=50 * gib, f_bavail=40 * gib
+        )
+
+        with patch("os.statvfs", return_value=fake_stat, create=True) as mock_statvfs:
+            health = monitor.get_health_status()
+            metrics = monitor.get_metrics()
+
+        mock_statvfs.assert_called_once()
+        assert metrics["disk_total_bytes"] == 100 * 1024**3
+        assert metrics["disk_used_bytes"] == 50 * 1024**3
+        assert metrics["disk_free_bytes"] == 40 * 1024**3
+        assert health["checks"][0]["status"] == "pass"
+
+    def test_health_http_endpoints(self):
+        """Test the health endpoints serve JSON over HTTP."""
+        # Port 0 lets the OS pick a free port
+        monitor = HealthMonitor({"health": {"enabled": True, "port": 0}})
+        try:
+            base_url = f"http://127.0.0.1:{monitor.http_server.server_address[1]}"
+
+            for path in ("/health", "/status", "/metrics"):
+                try:
+                    response = urllib.request.urlopen(base_url + path, timeout=5)
+                except urllib.error.HTTPError as e:
+                    response = e  # 503 when the host is short of disk space
+                with response:
+                    body = response.read()
+                    assert response.headers["Content-Type"] == "application/json"
+                    assert int(response.headers["Content-Length"]) == len(body)
+                    assert isinstance(json.loads(body), dict)
+
+            with pytest.raises(urllib.error.HTTPError) as not_found:
+                urllib.request.urlopen(base_url + "/missing", timeout=5)
+            assert not_found.value.code == 404
+
+            # Several requests can share one keep-alive connection
+            connection = http.client.HTTPConnection(
+                "127.0.0.1", monitor.http_server.server_address[1], timeout=5
+            )
+            try:
+                for _ in range(2):
+                    connection.request("GET", "/metrics")
+                    response = connection.getresponse()
+                    assert response.version == 11
+                    assert isinstance(json.loads(response.read()), dict)
+
+                # HEAD sends the same headers without a body
+                connection.request("HEAD", "/metrics")
+                response = connection.getresponse()
+                assert int(response.headers["Content-Length"]) > 0
+                assert response.read() == b""
+
+                # A matching If-None-Match gets 304 with no body
+                connection.request("GET", "/metrics")
+                response = connection.getresponse()
+                response.read()
+                etag = response.headers["ETag"]
+                connection.request("GET", "/metrics", headers={"If-None-Match": etag})
+                response = connection.getresponse()
+                assert response.status == 304
+                assert response.headers["ETag"] == etag
+                assert response.read() == b""
+            finally:
+                connection.close()
+        finally:
+            monitor.stop_http_server()
+
 
 class TestApplication:
     """Test main application functionality."""
 
     def test_main_application_import(self):
         """Test that main application can be imported."""
-        from main import BBCBulletinScraper
-
         app = BBCBulletinScraper()
         assert app is not None
         assert hasattr(app, "initialize")
         assert hasattr(app, "shutdown")
 
-    def test_programme_specific_trim_settings(self):
-        """Test per-programme trim settings override global settings."""
-        import tempfile
-        from pathlib import Path
-        from unittest.mock import MagicMock, patch
-
-        from audio_processor import AudioProcessor
-
-        # Global config with default trim settings
-        config = {
-            "audio": {
-                "trim_start_seconds": 4.0,
-                "trim_end_seconds": 1.0,
-                "format": "wav",
-            }
-        }
-        processor = AudioProcessor(config)
-
-        # Programme-specific config that overrides global settings
-        programme_config = {
-            "trim_start_seconds": 6.0,
-            "trim_end_seconds": 2.5,
-            "name": "Test Programme",
-        }
+    @pytest.fixture
+    def _root_logging(self):
+        """Restore the root logger after a test sets up application logging."""
+        root = logging.getLogger()
+        saved_handlers, saved_level = root.handlers[:], root.level
+        yield root
+        for handler in root.handlers:
+            if handler not in saved_handlers:
+                handler.close()
+        root.handlers[:] = saved_handlers
+        root.setLevel(saved_level)
+
+    def test_logging_through_queue(self, _root_logging):
+        """Test log records are written to the log file by a queue listener."""
+        app = BBCBulletinScraper()
+        root = _root_logging
 
         with tempfile.TemporaryDirectory() as temp_dir:
-            input_file = Path(temp_dir) / "input.m4a"
-            output_file = Path(temp_dir) / "output.wav"
-
-            # Create a fake input file
-            input_file.write_text("fake audio data")
-
-            # Mock subprocess.run to capture the actual command that would be executed
-            with (
-                patch("subprocess.run") as mock_run,
-                patch("os.open") as mock_open,
-                patch("os.close"),
-                patch("pathlib.Path.replace") as mock_replace,
-                patch.object(processor, "get_duration", return_value=60.0),
-            ):
-
-                # Mock successful ffmpeg execution
-                mock_result = MagicMock()
-                mock_result.returncode = 0
-                mock_run.return_value = mock_result
-
-                # Mock file lock
-                mock_open.return_value = 123
-
-                # Mock the atomic file move operation
-                mock_replace.return_value = None
-
-                # Call process_audio with programme_config to test the override logic
-                success = processor.process_audio(
-                    input_file, output_file, programme_config
+            log_file = Path(temp_dir) / "logs" / "scraper.log"
+            try:
+                app._setup_logging({"logging": {"file": str(log_file)}})
+                assert isinstance(root.handlers[0], logging.handlers.QueueHandler)
+
+                logging.warning("queued %s", "message")
+                app.shutdown()
+
+                # Records after shutdown bypass the stopped listener
+                assert not any(
+                    isinstance(handler, logging.handlers.QueueHandler)
+                    for handler in root.handlers
                 )
+                logging.warning("after shutdown")
+            finally:
+                app._stop_log_listener()
 
-                # Verify the method succeeded
-                assert success is True
-
-                # Verify subprocess was called
-                mock_run.assert_called_once()
-
-                # Get the actual command that was passed to subprocess.run
-                actual_cmd = mock_run.call_args[0][0]
-
-                # Verify that programme-specific trim values were used (not global ones)
+            lines = log_file.read_text().splitlines()
+            assert any(line.endswith("WARNING - queued message") for line in lines)
+            assert lines[-2].endswith("BBC Bulletin Scraper shutdown complete")
+            assert lines[-1].endswith("WARNING - after shutdown")
 
-                # Check start trim: should be 6.0 (programme) not 4.0 (global)
-                assert "-ss" in actual_cmd
-                ss_index = actual_cmd.index("-ss")
-                assert (
-                    float(actual_cmd[ss_index + 1]) == 6.0
-                ), f"Expected programme trim_start_seconds (6.0), got {actual_cmd[ss_index + 1]}"
+    def test_worker_process_logs_reach_log_file(self, _root_logging):
+        """Test audio worker processes log through the application's listener."""
+        app = BBCBulletinScraper()
 
-                # Check end trim: calculated duration should be 60 - 6.0 - 2.5 = 51.5
-                # (programme values: start=6.0, end=2.5, not global start=4.0, end=1.0)
-                assert "-t" in actual_cmd
-                t_index = actual_cmd.index("-t")
-                assert (
-                    float(actual_cmd[t_index + 1]) == 51.5
-                ), f"Expected programme-calculated duration (51.5), got {actual_cmd[t_index + 1]}"
+        with tempfile.TemporaryDirectory() as temp_dir:
+            log_file = Path(temp_dir) / "scraper.log"
+            # A programme config that isn't a mapping fails inside the worker
+            job = (Path(temp_dir) / "broken.m4a", Path(temp_dir) / "out.wav", "bad")
+            # Spawned workers inherit no logging setup, only the pool initializer's
+            spawn = multiprocessing.get_context("spawn")
+            try:
+                app._setup_logging({"logging": {"file": str(log_file)}})
+                with patch("multiprocessing.get_context", return_value=spawn):
+                    results = AudioProcessor({"audio": {}}).process_batch([job])
+            finally:
+                app._stop_log_listener()
+
+            assert results == [False]
+            assert "ERROR - Batch audio processing error for" in log_file.read_text()
+
+    def test_run_returns_on_shutdown(self):
+        """Test run() blocks until shutdown() is called."""
+        app = BBCBulletinScraper()
+        app.scheduler = MagicMock()
 
-                # Additional verification: test without programme config to ensure global values work
+        with patch.object(app, "initialize", return_value=True):
+            runner = threading.Thread(target=app.run)
+            runner.start()
+            threading.Timer(0.1, app.shutdown).start()
+            runner.join(timeout=5)
 
-            # Test that global config is used when no programme config is provided
-            with (
-                patch("subprocess.run") as mock_run_global,
-                patch("os.open") as mock_open_global,
-                patch("os.close"),
-                patch("pathlib.Path.replace") as mock_replace_global,
-                patch.object(processor, "get_duration", return_value=60.0),
-            ):
+        assert not runner.is_alive()
+        assert app.running is False
+        app.scheduler.shutdown.assert_called_once()
 
-                mock_result_global = MagicMock()
-                mock_result_global.returncode = 0
-                mock_run_global.return_value = mock_result_global
-                mock_open_global.return_value = 124
+    @pytest.fixture
+    def _audio_env(self, tmp_path, patched_subprocess):
+        """Input and output paths plus a processor with global trim settings."""
+        input_file = tmp_path / "input.m4a"
+        output_file = tmp_path / "output.wav"
 
-                # Mock the atomic file move operation
-                mock_replace_global.return_value = None
+        # Create a fake input file
+        input_file.write_text("fake audio data")
 
-                # Call process_audio WITHOUT programme_config
-                success_global = processor.process_audio(input_file, output_file, None)
+        # Global config with default trim settings
+        config = {
+            "audio": {
+                "trim_start_seconds": 4.0,
+                "trim_end_seconds": 1.0,
+                "format": "wav",
+            }
+        }
+        return input_file, output_file, AudioProcessor(config)
+
+    @pytest.mark.xdist_group("audio")
+    @pytest.mark.parametrize(
+        "programme_config,expected_ss,expected_t",
+        [
+            # Programme-specific config overrides global settings: 60 - 6.0 - 2.5
+            (
+                {
+                    "trim_start_seconds": 6.0,
+                    "trim_end_seconds": 2.5,
+                    "name": "Test Programme",
+                },
+                6.0,
+                51.5,
+            ),
+            # Global config is used without a programme config: 60 - 4.0 - 1.0
+            (None, 4.0, 55.0),
+        ],
+        ids=["programme", "global"],
+    )
+    def test_programme_specific_trim_settings(
+        self, _audio_env, patched_subprocess, programme_config, expected_ss, expected_t
+    ):
+        """Test per-programme trim settings override global settings."""
+        input_file, output_file, processor = _audio_env
+        mock_run = patched_subprocess
 
-                assert success_global is True
-                mock_run_global.assert_called_once()
+        with patch.object(processor, "get_duration", return_value=60.0):
+            success = processor.process_audio(input_file, output_file, programme_config)
 
-                # Get the command for global config
-                global_cmd = mock_run_global.call_args[0][0]
+        assert success is True
+        mock_run.assert_called_once()
 
-                # Should use global values: start=4.0, end=1.0
-                # Calculated duration: 60 - 4.0 - 1.0 = 55.0
-                ss_index_global = global_cmd.index("-ss")
-                assert (
-                    float(global_cmd[ss_index_global + 1]) == 4.0
-                ), f"Expected global trim_start_seconds (4.0), got {global_cmd[ss_index_global + 1]}"
+        # Get the actual command that was passed to subprocess.run
+        actual_cmd = mock_run.call_args[0][0]
 
-                t_index_global = global_cmd.index("-t")
-                assert (
-                    float(global_cmd[t_index_global + 1]) == 55.0
-                ), f"Expected global-calculated duration (55.0), got {global_cmd[t_index_global + 1]}"
+        # Check start trim
+        ss_index = actual_cmd.index("-ss")
+        assert (
+            float(actual_cmd[ss_index + 1]) == expected_ss
+        ), f"Expected trim_start_seconds {expected_ss}, got {actual_cmd[ss_index + 1]}"
+        # Start trim is an input option so ffmpeg seeks instead of decoding
+        assert ss_index < actual_cmd.index("-i")
 
-    def test_explicit_format_specification(self):
+        # Check end trim, as the duration left after trimming both ends
+        t_index = actual_cmd.index("-t")
+        assert (
+            float(actual_cmd[t_index + 1]) == expected_t
+        ), f"Expected calculated duration {expected_t}, got {actual_cmd[t_index + 1]}"
+
+    # M4A is written by ffmpeg's ipod muxer
+    @pytest.mark.parametrize(
+        "output_format,muxer", [("mp3", "mp3"), ("m4a", "ipod"), ("wav", "wav")]
+    )
+    def test_explicit_format_specification(
+        self, tmp_path, wav_processor, output_format, muxer
+    ):
         """Test that FFmpeg command includes explicit format specification."""
-        import tempfile
-
-        from audio_processor import AudioProcessor
-
-        config = {"audio": {"format": "wav"}}
-        processor = AudioProcessor(config)
+        processor = wav_processor
 
         # Test with realistic temporary file paths that match the actual implementation
-        with tempfile.TemporaryDirectory() as temp_dir:
-            input_file = Path(temp_dir) / "input.m4a"
-            temp_output = (
-                Path(temp_dir) / "output.processing.abc12345"
-            )  # Simulate unique ID
-
-            # Build command and check for explicit format specification
-            cmd = processor._build_ffmpeg_command(  # pylint: disable=protected-access
-                input_file,
-                temp_output,
-                trim_start_seconds=0,
-                trim_end_seconds=0,
-                normalise_lufs=None,
-                output_format="wav",
-            )
+        input_file = tmp_path / "input.m4a"
+        temp_output = tmp_path / "output.processing.abc12345"  # Simulate unique ID
+
+        # Build command and check for explicit format specification
+        cmd = processor._build_ffmpeg_command(  # pylint: disable=protected-access
+            input_file,
+            temp_output,
+            trim_start_seconds=0,
+            trim_end_seconds=0,
+            normalise_lufs=None,
+            output_format=output_format,
+        )
 
-        # Check that -f wav is present in the command
+        # Check that the muxer is named explicitly, as the temp name has no extension
         assert "-f" in cmd
         f_index = cmd.index("-f")
-        assert (
-            cmd[f_index + 1] == "wav"
-        ), "Explicit format specification should be present"
-
-        # Test with different formats
-        for output_format in ["mp3", "m4a", "wav"]:
-            temp_format_output = Path(temp_dir) / f"output.processing.{output_format}"
-            cmd_format = (
-                processor._build_ffmpeg_command(  # pylint: disable=protected-access
-                    input_file,
-                    temp_format_output,
-                    trim_start_seconds=0,
-                    trim_end_seconds=0,
-                    normalise_lufs=None,
-                    output_format=output_format,
-                )
-            )
-            assert "-f" in cmd_format
-            f_idx = cmd_format.index("-f")
-            assert (
-                cmd_format[f_idx + 1] == output_format
-            ), f"Format {output_format} should be specified"
-
-
-def test_package_structure():
-    """Test that all required modules are available."""
-    required_modules = [
-        "main",
-        "config_manager",
-        "scraper",
-        "audio_processor",
-        "scheduler",
-        "health_monitor",
-    ]
-
-    for module_name in required_modules:
-        try:
-            __import__(module_name)
-        except ImportError as e:
-            pytest.fail(f"Required module {module_name} could not be imported: {e}")
+        assert cmd[f_index + 1] == muxer, f"Format {output_format} should be specified"
+
+    def test_m4a_faststart(self, audio_processor_factory):
+        """Test M4A output is written with its index at the start for streaming."""
+        processor = audio_processor_factory(format="m4a")
+        assert "+faststart" in processor._build_format_args("m4a")
+
+
+@pytest.mark.parametrize("module_name", REQUIRED_MODULES)
+def test_module_discoverable(module_name):
+    """Test that each required module can be found without importing it."""
+    assert (
+        importlib.util.find_spec(module_name) is not None
+    ), f"Required module {module_name} could not be found"
+
+
+@pytest.mark.slow
+def test_package_imports():
+    """Test that all required modules import cleanly in a fresh interpreter."""
+    # subprocess.run is stubbed for every test, so start the interpreter directly
+    with subprocess.Popen(
+        [
+            sys.executable,
+            "-c",
+            f"import {', '.join(REQUIRED_MODULES)}",
+        ],
+        cwd=_SRC_DIR,
+        stderr=subprocess.PIPE,
+        text=True,
+    ) as process:
+        _, stderr = process.communicate(timeout=60)
+    assert process.returncode == 0, stderr
 
 
 def test_configuration_file_exists():
     """Test that configuration file template exists."""
-    config_path = Path(__file__).parent.parent / "config" / "config.yaml"
-    assert config_path.exists(), "Configuration template file should exist"
+    assert _CONFIG_PATH.is_file(), "Configuration template file should exist"
 
 
 if __name__ == "__main__":